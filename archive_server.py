@@ -0,0 +1,56 @@
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import http_archive
+
+# Local stand-in for teamrankings.com, sports-reference.com and covers.com built from
+# the HTTP archive. GET /<host>/<path>?<query> answers with the archived capture of
+# https://<host>/<path>?<query>. Point the scrapers at it with
+#     NCAAB_STANDIN=http://127.0.0.1:8765 python web_scraping.py
+
+
+def make_handler(root=http_archive.ARCHIVE_DIR, as_of=None):
+    class ArchiveHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            host, _, rest = self.path.lstrip("/").partition("/")
+            url = f"https://{host}/{rest}"
+            entry = http_archive.lookup(url, as_of, root)
+            if entry is None:
+                self.send_error(404, f"No capture of {url}")
+                return
+
+            etag = entry["headers"].get("etag")
+            if etag and self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+
+            body = http_archive.load_body(entry, root)
+            self.send_response(entry["status"])
+            for name in ("content-type", "etag", "last-modified"):
+                if name in entry["headers"]:
+                    self.send_header(name, entry["headers"][name])
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return ArchiveHandler
+
+
+def serve(port=8765, root=http_archive.ARCHIVE_DIR, as_of=None):
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(root, as_of))
+    print(f"Serving {root} on http://127.0.0.1:{port}")
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve archived responses as a local stand-in for the scraped sites.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--archive", default=http_archive.ARCHIVE_DIR)
+    parser.add_argument("--as-of", help="serve captures as they were at this ISO date/time (UTC)")
+    args = parser.parse_args()
+    serve(args.port, args.archive, args.as_of).serve_forever()
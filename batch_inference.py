@@ -0,0 +1,97 @@
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+import display_artifact
+import instrumentation
+import model_bundle
+from model_training import PREDICTIONS_FILE, format_predictions, load_features, load_pickle, save_predictions
+
+# -------------------------------
+# Config
+# -------------------------------
+APP_PREDICTIONS_FILE = os.path.join("ncaabb_2025_2026", PREDICTIONS_FILE)
+APP_DISPLAY_FILE = os.path.join("ncaabb_2025_2026", display_artifact.DISPLAY_FILE)
+
+KEY_COLS = ["Date.Game", "Home", "Away"]
+BATCH_SIZE = 1024
+
+
+# -------------------------------
+# Scoring
+# -------------------------------
+def select_games(df_new, df_existing, score_all=False):
+    # Games not yet in the predictions, plus games still unplayed when last scored
+    if score_all or df_existing is None or df_existing.empty:
+        return np.ones(len(df_new), dtype=bool)
+    key_new = pd.MultiIndex.from_arrays([pd.to_datetime(df_new["Date.Game"]), df_new["Home"], df_new["Away"]])
+    existing = df_existing.dropna(subset=["Home.Points", "Away.Points"])
+    key_done = pd.MultiIndex.from_arrays([pd.to_datetime(existing["Date.Game"]), existing["Home"], existing["Away"]])
+    return ~key_new.isin(key_done)
+
+
+def predict_batches(model, X, batch_size=BATCH_SIZE):
+    winner_prob, spread_pred = model.predict(X, batch_size=batch_size, verbose=0)
+    return spread_pred.ravel(), winner_prob.ravel()
+
+
+def upsert_predictions(df_existing, df_scored):
+    if df_existing is None or df_existing.empty:
+        return df_scored.reset_index(drop=True)
+    key_scored = pd.MultiIndex.from_arrays([pd.to_datetime(df_scored["Date.Game"]), df_scored["Home"], df_scored["Away"]])
+    key_existing = pd.MultiIndex.from_arrays([pd.to_datetime(df_existing["Date.Game"]), df_existing["Home"], df_existing["Away"]])
+    df_kept = df_existing[~key_existing.isin(key_scored)]
+    return pd.concat([df_kept, df_scored], ignore_index=True)
+
+
+def run(score_all=False, batch_size=BATCH_SIZE, publish=False, version=None):
+    start = time.time()
+    bundle = model_bundle.load_bundle(version)
+    feature_cols = bundle.feature_cols
+
+    with instrumentation.stage("inference_features"):
+        df_filtered, reverse_name_map = load_features()
+        df_filtered = df_filtered.dropna(subset=feature_cols)
+        df_existing = load_pickle(PREDICTIONS_FILE)
+
+    # Compare on Sports Reference names, which is what the predictions file holds
+    names = df_filtered[KEY_COLS].copy()
+    names["Home"] = names["Home"].map(reverse_name_map)
+    names["Away"] = names["Away"].map(reverse_name_map)
+    df_target = df_filtered[select_games(names, df_existing, score_all)]
+    print(f"Scoring {len(df_target)} of {len(df_filtered)} games")
+
+    if df_target.empty:
+        return df_existing
+
+    with instrumentation.stage("inference_predict"):
+        X = bundle.transform(df_target)
+        spread_pred, winner_prob = predict_batches(bundle.model, X, batch_size)
+        df_scored = format_predictions(df_target, spread_pred, winner_prob, reverse_name_map)
+    instrumentation.record_rows("games_scored", len(df_scored))
+
+    df_predictions = upsert_predictions(df_existing, df_scored)
+    save_predictions(df_predictions)
+    print(f"Model bundle {bundle.version}: wrote {len(df_predictions)} predictions to {PREDICTIONS_FILE} in {time.time() - start:.1f}s")
+
+    if publish:
+        # Copy then rename: the running app picks up the new artifact without a redeploy
+        for source, target in [(PREDICTIONS_FILE, APP_PREDICTIONS_FILE), (display_artifact.DISPLAY_FILE, APP_DISPLAY_FILE)]:
+            shutil.copy(source, target + ".tmp")
+            os.replace(target + ".tmp", target)
+        print(f"Copied {PREDICTIONS_FILE} and {display_artifact.DISPLAY_FILE} to {os.path.dirname(APP_PREDICTIONS_FILE)}")
+    return df_predictions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score new and upcoming games with the saved model, without retraining.")
+    parser.add_argument("--all", action="store_true", help="rescore every game, not only new and unplayed ones")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--publish", action="store_true", help="copy the predictions into the Shiny app folder")
+    parser.add_argument("--version", help="model bundle version (default: latest)")
+    args = parser.parse_args()
+    run(score_all=args.all, batch_size=args.batch_size, publish=args.publish, version=args.version)
@@ -0,0 +1,100 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import display_artifact
+import synthetic_season
+
+# -------------------------------
+# Config
+# -------------------------------
+APP_DIR = os.path.join(ROOT, "ncaabb_2025_2026")
+APP_FILES = ["app.py", "api.py"]
+
+# Cold `import app` (what a new worker pays before serving) must stay under this
+IMPORT_BUDGET_MS = 2000
+
+# Modules that must not be loaded until a page actually needs them
+DEFERRED_MODULES = ["plotly.express", "shinywidgets", "ipywidgets", "sklearn", "tensorflow"]
+
+CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import app
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "loaded": [m for m in %r if m in sys.modules]}))
+""" % (DEFERRED_MODULES,)
+
+
+def import_module_times(workdir):
+    # Cumulative import time (ms) of each module app.py imports directly, from -X importtime
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"],
+                            cwd=workdir, capture_output=True, text=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2]
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            top = name.strip().split(".")[0]
+            times[top] = times.get(top, 0) + int(parts[1]) / 1000
+    return times
+
+
+def run(repeat=5, budget_ms=IMPORT_BUDGET_MS, artifact=None):
+    workdir = tempfile.mkdtemp(prefix="bench_app_")
+    try:
+        for name in APP_FILES:
+            shutil.copy(os.path.join(APP_DIR, name), workdir)
+        target = os.path.join(workdir, display_artifact.DISPLAY_FILE)
+        artifact = artifact or os.path.join(APP_DIR, display_artifact.DISPLAY_FILE)
+        if os.path.exists(artifact):
+            shutil.copy(artifact, target)
+            source = artifact
+        else:
+            display_artifact.save_display(synthetic_season.predictions(6000), target)
+            source = "synthetic artifact (6000 games)"
+        print(f"App startup from {source}")
+
+        # Fresh interpreter per run: module caches are cold, as on a new worker
+        runs = []
+        for _ in range(repeat):
+            result = subprocess.run([sys.executable, "-c", CHILD], cwd=workdir, capture_output=True, text=True)
+            if result.returncode != 0:
+                print(result.stderr)
+                return False
+            runs.append(json.loads(result.stdout.strip().splitlines()[-1]))
+
+        median_ms = statistics.median(r["seconds"] for r in runs) * 1000
+        loaded = sorted(set().union(*(r["loaded"] for r in runs)))
+        print(f" import app: median {median_ms:.0f} ms over {repeat} runs (budget {budget_ms} ms)")
+        print(" slowest imports of app.py (ms):")
+        for name, ms in sorted(import_module_times(workdir).items(), key=lambda kv: -kv[1])[:8]:
+            print(f"   {name:<20}{ms:>8.0f}")
+        if loaded:
+            print(f" loaded at startup but should be deferred: {loaded}")
+
+        ok = median_ms <= budget_ms and not loaded
+        print(" OK" if ok else " FAILED")
+        return ok
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time a cold import of the Shiny app and check it against the startup budget.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=int, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--artifact", help="display artifact to start from (default: the app folder's, else synthetic)")
+    args = parser.parse_args()
+    sys.exit(0 if run(args.repeat, args.budget_ms, args.artifact) else 1)
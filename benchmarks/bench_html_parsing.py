@@ -0,0 +1,95 @@
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import html_parsing
+
+# -------------------------------
+# Config
+# -------------------------------
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "teamrankings")
+FIXTURE_PAGES = ["offensive-efficiency", "three-point-pct", "free-throw-pct", "possessions-per-game"]
+FIXTURE_RATINGS = ["predictive-by-other", "schedule-strength-by-other"]
+SYNTHETIC_TEAMS = 365
+
+
+def synthetic_page(teams=SYNTHETIC_TEAMS):
+    # TeamRankings-shaped stat page when no fixtures are saved: page chrome around the
+    # stats table, whose cells carry the links, entities and whitespace real pages have
+    header = "".join(f"<th class=\"text-right\">{col}</th>" for col in ["Rank", "Team", "2025", "Last 3", "Last 1", "Home", "Away", "2024"])
+    rows = []
+    for i in range(teams):
+        name = f"Team {i} A&amp;M" if i % 17 == 0 else f"Team {i}"
+        values = "".join(f"<td class=\"text-right\" data-sort=\"{(i * 7 + k) % 97 + 0.5}\">{(i * 7 + k) % 97 + 0.5}</td>" for k in range(6))
+        rows.append(f"<tr>\n  <td class=\"rank\">{i + 1}</td>\n  <td class=\"text-left nowrap\" data-sort=\"{name}\">"
+                    f"<a href=\"/ncaa-basketball/team/team-{i}\"> {name} </a><!-- team --></td>{values}\n</tr>")
+    table = (f"<table class=\"tr-table datatable scrollable\"><thead><tr>{header}</tr></thead>"
+             f"<tbody>{''.join(rows)}</tbody></table>")
+    chrome = "".join(f"<div class=\"nav\"><a href=\"/page-{i}\">Link {i}</a><script>var x{i} = {i};</script></div>" for i in range(400))
+    return f"<!DOCTYPE html><html><head><title>Stats</title></head><body>{chrome}<main>{table}</main>{chrome}</body></html>"
+
+
+def fetch_fixtures(date, fixture_dir=FIXTURE_DIR):
+    # Save a handful of real TeamRankings pages to benchmark against
+    from fetch_utils import fetch
+
+    os.makedirs(fixture_dir, exist_ok=True)
+    urls = [f"https://www.teamrankings.com/ncaa-basketball/stat/{page}?date={date}" for page in FIXTURE_PAGES]
+    urls += [f"https://www.teamrankings.com/ncaa-basketball/ranking/{page}?date={date}" for page in FIXTURE_RATINGS]
+    for url in urls:
+        name = url.rsplit("/", 1)[-1].replace("?date=", "_") + ".html"
+        with open(os.path.join(fixture_dir, name), "w", encoding="utf-8") as f:
+            f.write(fetch(url).text)
+        print(f"Saved {name}")
+
+
+def run(fixture_dir=FIXTURE_DIR, repeat=5):
+    paths = sorted(glob.glob(os.path.join(fixture_dir, "*.html")))
+    pages = {}
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.basename(path)] = f.read()
+    if not pages:
+        print(f"No fixtures in {fixture_dir} (save some with --fetch YYYY-MM-DD); using a synthetic {SYNTHETIC_TEAMS}-team page")
+        pages["synthetic"] = synthetic_page()
+
+    # The current scrape_table() path is the reference every backend must match
+    reference = {name: html_parsing.parse_table(html, "bs4", streaming=False) for name, html in pages.items()}
+
+    results = []
+    for backend in html_parsing.BACKENDS:
+        for streaming in (False, True):
+            for name, html in pages.items():
+                df = html_parsing.parse_table(html, backend, streaming)
+                pd.testing.assert_frame_equal(df, reference[name], obj=f"{backend} streaming={streaming} {name}")
+
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for html in pages.values():
+                    html_parsing.parse_table(html, backend, streaming)
+            ms_per_page = (time.perf_counter() - start) * 1000 / (repeat * len(pages))
+            results.append({"backend": backend, "streaming": streaming, "ms_per_page": round(ms_per_page, 2)})
+
+    df_results = pd.DataFrame(results)
+    baseline = df_results.loc[(df_results["backend"] == "bs4") & (~df_results["streaming"]), "ms_per_page"].item()
+    df_results["speedup"] = (baseline / df_results["ms_per_page"]).round(1)
+    print(f"{len(pages)} page(s), {repeat} repeats; all backends returned identical frames")
+    print(df_results.to_string(index=False))
+    return df_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare scrape_table() HTML parsing backends on saved pages (or a synthetic one).")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fetch", metavar="DATE", help="download fixture pages for DATE (YYYY-MM-DD) first")
+    args = parser.parse_args()
+    if args.fetch:
+        fetch_fixtures(args.fetch, args.fixtures)
+    run(args.fixtures, args.repeat)
@@ -0,0 +1,94 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import scores_store
+import synthetic_season
+
+# -------------------------------
+# Config
+# -------------------------------
+GAMES_PER_DAY = 60
+
+
+def synthetic_scores(days, games_per_day=GAMES_PER_DAY, seed=0):
+    # Stand-in when there is no scores store to benchmark against
+    df = synthetic_season.scores(days, games_per_day, seed)
+    df = df.drop_duplicates(subset=scores_store.KEY_COLS).reset_index(drop=True)
+    return scores_store.normalize(df)
+
+
+def timed(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = func()
+    return result, (time.perf_counter() - start) * 1000 / repeat
+
+
+def folder_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(dirpath, name)) for dirpath, _, names in os.walk(path) for name in names)
+
+
+def run(days=None, repeat=3):
+    if days is None and scores_store.list_dates():
+        df_scores = scores_store.normalize(scores_store.load_scores())
+        source = f"scores store ({len(scores_store.list_dates())} dates)"
+    else:
+        df_scores = synthetic_scores(days or 150)
+        source = f"synthetic season ({days or 150} days)"
+
+    tmp = tempfile.mkdtemp()
+    try:
+        excel_file = os.path.join(tmp, "df_scores.xlsx")
+        store_dir = os.path.join(tmp, "scores_store")
+
+        # Today's path: rewrite the whole workbook, read it back with openpyxl
+        _, excel_write = timed(lambda: df_scores.to_excel(excel_file, index=False), repeat)
+        df_excel, excel_read = timed(lambda: pd.read_excel(excel_file), repeat)
+
+        def write_store():
+            shutil.rmtree(store_dir, ignore_errors=True)
+            scores_store.upsert(df_scores, store_dir)
+
+        _, store_write = timed(write_store, repeat)
+        df_store, store_read = timed(lambda: scores_store.load_scores(root=store_dir), repeat)
+        pd.testing.assert_frame_equal(scores_store.normalize(df_store), df_scores, obj="scores store round-trip")
+
+        # A day's rescrape only rewrites that day's partition
+        last_day = df_scores[df_scores["date_game"] == df_scores["date_game"].max()].copy()
+        last_day[["team_score_home", "team_score_away"]] = 70.0
+        _, store_update = timed(lambda: scores_store.upsert(last_day, store_dir), 1)
+
+        results = pd.DataFrame([
+            {"path": "excel", "write_ms": excel_write, "read_ms": excel_read, "update_day_ms": excel_write,
+             "size_kb": folder_size(excel_file) / 1024,
+             "date_game": str(df_excel["date_game"].dtype), "date_stat": str(df_excel["date_stat"].dtype),
+             "scores": str(df_excel["team_score_home"].dtype)},
+            {"path": "scores_store", "write_ms": store_write, "read_ms": store_read, "update_day_ms": store_update,
+             "size_kb": folder_size(store_dir) / 1024,
+             "date_game": str(df_store["date_game"].dtype), "date_stat": str(df_store["date_stat"].dtype),
+             "scores": str(df_store["team_score_home"].dtype)},
+        ]).round(1)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    print(f"{len(df_scores)} games from {source}, {repeat} repeats")
+    print(results.to_string(index=False))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the Excel scores round-trip with the Parquet scores store.")
+    parser.add_argument("--days", type=int, help="benchmark a synthetic season of this many days instead of the store")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run(args.days, args.repeat)
@@ -0,0 +1,87 @@
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import model_training
+import synthetic_season
+
+# -------------------------------
+# Config
+# -------------------------------
+EPOCHS = 20
+# (input pipeline, batch size); arrays at 32 is how the notebook has always trained
+RUNS = [("arrays", 32), ("tf.data", 32), ("tf.data", 128), ("tf.data", 512)]
+SYNTHETIC_GAMES = 6000
+SYNTHETIC_FEATURES = 120
+
+
+def load_frame(synthetic=False):
+    if not synthetic:
+        try:
+            df_filtered, _ = model_training.load_features()
+            df_analyze = model_training.training_frame(df_filtered)
+            return df_analyze, df_filtered.loc[df_analyze.index, "Date.Game"], f"feature store ({len(df_analyze)} games)"
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Feature inputs unavailable ({e!r}); using a synthetic season")
+    df, dates = synthetic_season.training_frame(SYNTHETIC_GAMES, SYNTHETIC_FEATURES)
+    return df, dates, f"synthetic ({len(df)} games)"
+
+
+def run(epochs=EPOCHS, runs=RUNS, split=model_training.SPLIT, synthetic=False,
+        intra_op_threads=model_training.INTRA_OP_THREADS, inter_op_threads=model_training.INTER_OP_THREADS):
+    df_analyze, dates, source = load_frame(synthetic)
+    data, _, _ = model_training.split_data(df_analyze, split, dates)
+    print(f"Training from {source}, {split} split: {len(data['X_train'])} train / {len(data['X_val'])} val / "
+          f"{len(data['X_test'])} test, {epochs} epochs")
+
+    # Thread pools can only be set before TensorFlow starts, so once for every run
+    model_training.configure_threads(intra_op_threads, inter_op_threads)
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for pipeline, batch_size in runs:
+            best_model, _, history, seconds = model_training.train(
+                data, epochs, batch_size, checkpoint_file=os.path.join(tmp, "best.h5"), verbose=0,
+                use_dataset=pipeline == "tf.data", intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads,
+            )
+            performance = model_training.evaluate(best_model, data)
+            regression = performance["regression"]["test"].iloc[0]
+            classification = performance["classification"]["test"].iloc[0]
+            rows.append({
+                "pipeline": pipeline,
+                "batch": batch_size,
+                # The first epoch includes tracing and the dataset cache fill
+                "epoch s (median)": statistics.median(history.epoch_seconds[1:] or history.epoch_seconds),
+                "first epoch s": history.epoch_seconds[0],
+                "total s": seconds,
+                "test RMSE": regression["RMSE"],
+                "test MAE": regression["MAE"],
+                "test accuracy": classification["Accuracy"],
+                "test precision": classification["Precision"],
+                "test F1": classification["F1 Score"],
+            })
+
+    df_results = pd.DataFrame(rows)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(df_results.round(3).to_string(index=False))
+    return df_results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Epoch time against test quality for input pipelines and batch sizes.")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", help="tf.data batch sizes (default: 32 128 512, plus arrays at 32)")
+    parser.add_argument("--split", choices=model_training.SPLITS, default=model_training.SPLIT)
+    parser.add_argument("--synthetic", action="store_true", help="use a synthetic season even if the feature inputs exist")
+    parser.add_argument("--intra-op-threads", type=int, default=model_training.INTRA_OP_THREADS)
+    parser.add_argument("--inter-op-threads", type=int, default=model_training.INTER_OP_THREADS)
+    args = parser.parse_args()
+
+    runs = RUNS if not args.batch_sizes else [("arrays", 32)] + [("tf.data", b) for b in args.batch_sizes]
+    run(args.epochs, runs, args.split, args.synthetic, args.intra_op_threads, args.inter_op_threads)
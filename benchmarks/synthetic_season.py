@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Config
+# -------------------------------
+# Season-shaped stand-ins for the benchmarks when there is no store or artifact at hand
+SEASON_START = "2025-11-03"
+SEASON_DAYS = 120
+TEAMS = np.array([f"Team {i}" for i in range(360)])
+
+
+def game_dates(rng, games, start=SEASON_START, days=SEASON_DAYS):
+    # Game dates spread over the season, in date order
+    return pd.Timestamp(start) + pd.to_timedelta(np.sort(rng.integers(0, days, games)), unit="D")
+
+
+def matchups(rng, games):
+    return TEAMS[rng.integers(0, len(TEAMS), games)], TEAMS[rng.integers(0, len(TEAMS), games)]
+
+
+def points(rng, games):
+    return rng.integers(45, 100, games).astype(float), rng.integers(45, 100, games).astype(float)
+
+
+# -------------------------------
+# Frames
+# -------------------------------
+def scores(days, games_per_day, seed=0):
+    """Scraped-scores frame (scores_store columns): `games_per_day` games a day, the last day unplayed."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(SEASON_START, periods=days).repeat(games_per_day)
+    home, away = matchups(rng, len(dates))
+    home_pts, away_pts = points(rng, len(dates))
+    unplayed = dates == dates.max()
+    home_pts[unplayed], away_pts[unplayed] = np.nan, np.nan
+    return pd.DataFrame({
+        "date_game": dates,
+        "date_stat": dates - pd.Timedelta(days=1),
+        "team_name_home": home,
+        "team_score_home": home_pts,
+        "team_name_away": away,
+        "team_score_away": away_pts,
+    })
+
+
+def predictions(games, seed=0):
+    """Predictions frame (model_training.save_predictions columns) up to today; the next three days are unplayed."""
+    rng = np.random.default_rng(seed)
+    today = pd.Timestamp.today().normalize()
+    dates = game_dates(rng, games, start=today - pd.Timedelta(days=SEASON_DAYS), days=SEASON_DAYS + 3)
+    home, away = matchups(rng, games)
+    home_pts, away_pts = points(rng, games)
+    home_pts[dates >= today], away_pts[dates >= today] = np.nan, np.nan
+    favorite = np.where(rng.random(games) < 0.5, home, away)
+    return pd.DataFrame({
+        "Date.Game": dates, "Home": home, "Away": away,
+        "Favorite": favorite, "Underdog": np.where(favorite == home, away, home),
+        "Home.Points": home_pts, "Away.Points": away_pts,
+        "Underdog.Win": np.where(np.isnan(home_pts), np.nan, rng.integers(0, 2, games)),
+        "Predicted.Underdog.Win.Prob": rng.random(games),
+        "Score.Diff": home_pts - away_pts,
+        "Predicted.Score.Diff": rng.normal(0, 10, games),
+    })
+
+
+def training_frame(games, features, seed=0):
+    """Stand-in for model_training.training_frame (targets + float32 predictors) and its game dates."""
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(games, features)).astype("float32")
+    weights = rng.normal(size=features) / np.sqrt(features)
+    spread = 10 * X @ weights + rng.normal(0, 8, games)
+    df = pd.DataFrame(X, columns=[f"feature_{i}" for i in range(features)])
+    df.insert(0, "Underdog.Win", (spread + rng.normal(0, 6, games) < -4).astype(int))
+    df.insert(1, "Score.Diff", spread.round())
+    df.insert(2, "Total.Pts", rng.normal(140, 15, games).round())
+    return df, game_dates(rng, games)
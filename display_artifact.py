@@ -0,0 +1,154 @@
+import argparse
+import hashlib
+import os
+import pickle
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------
+# Config
+# -------------------------------
+# The Shiny app loads this instead of the full predictions frame: one row per game,
+# only the columns the app shows or filters on, derived columns already computed.
+# The file is a pickled dict {"schema", "version", "created", "games", "ledger"};
+# `version` is a hash of the games frame, so the app can key caches on it.
+PREDICTIONS_FILE = "NCAA_Basketball_Spread_Predictions_2025_2026.rds"
+DISPLAY_FILE = "NCAA_Basketball_Display_2025_2026.rds"
+SCHEMA = 2
+
+# Power applied to the winner's probability to accentuate differences in the plots
+WIN_PROB_POWER = 2.5
+
+COLUMNS = [
+    "Date.Game", "Home", "Away",
+    "Predicted.Winner", "Predicted.Winner.Ranking.Position", "Opponent", "Actual.Winner", "Model.Pick",
+    "Predicted.Score.Diff", "Actual.Score.Diff", "Win.Probability",
+    "Underdog.Win", "Predicted.Underdog.Win.Prob", "Played", "Models.Agree",
+]
+
+
+# -------------------------------
+# Build
+# -------------------------------
+def build_display(df_predictions):
+    """Display frame for the app, with every derived column computed column-wise."""
+    df = df_predictions
+    prob = df["Predicted.Underdog.Win.Prob"].to_numpy(dtype="float64")
+    underdog_wins = prob >= 0.5
+    home = df["Home"].astype(str).to_numpy()
+    away = df["Away"].astype(str).to_numpy()
+    score_diff = df["Score.Diff"].to_numpy(dtype="float64")
+    played = (df["Home.Points"].notna() & df["Away.Points"].notna()).to_numpy()
+
+    predicted_winner = np.where(underdog_wins, df["Underdog"].astype(str), df["Favorite"].astype(str))
+    actual_winner = np.where(score_diff > 0, home, away)
+
+    # Winner's probability, mapped [0.5, 1] -> [0, 1], raised to WIN_PROB_POWER and mapped back
+    win_prob = np.where(underdog_wins, prob, 1 - prob)
+    win_prob = np.round(0.5 + 0.5 * (2 * (win_prob - 0.5)) ** WIN_PROB_POWER, 3)
+    win_prob[win_prob == 1] = 0.999
+
+    # Spreads to the nearest half point
+    predicted_diff = np.round(df["Predicted.Score.Diff"].to_numpy(dtype="float64") * 2) / 2
+
+    # The spread and winner models disagree when the winner's side has the wrong spread sign
+    disagree = ((predicted_winner == home) & (predicted_diff < 0)) | ((predicted_winner == away) & (predicted_diff > 0))
+
+    df_display = pd.DataFrame({
+        "Date.Game": pd.to_datetime(df["Date.Game"]).dt.strftime("%Y-%m-%d").to_numpy(),
+        "Home": home,
+        "Away": away,
+        "Predicted.Winner": predicted_winner,
+        "Predicted.Winner.Ranking.Position": np.where(underdog_wins, "Underdog", "Favorite"),
+        "Opponent": np.where(predicted_winner == away, home, away),
+        "Actual.Winner": actual_winner,
+        "Model.Pick": np.where(played, np.where(actual_winner == predicted_winner, "Correct", "Incorrect"), None),
+        "Predicted.Score.Diff": predicted_diff,
+        "Actual.Score.Diff": score_diff,
+        "Win.Probability": win_prob,
+        "Underdog.Win": df["Underdog.Win"].to_numpy(dtype="float64"),
+        "Predicted.Underdog.Win.Prob": prob,
+        "Played": played,
+        "Models.Agree": ~disagree,
+    })
+    # Two-valued labels are stored as categories
+    for col in ["Predicted.Winner.Ranking.Position", "Model.Pick"]:
+        df_display[col] = df_display[col].astype("category")
+    return df_display[COLUMNS]
+
+
+# Per-date sums over played games; every metric the app shows is a ratio of these
+LEDGER_SUMS = ["games", "sq_err", "abs_err", "tp", "fp", "fn", "tn"]
+
+
+def metrics_ledger(df_display):
+    """Metrics ledger: one row per game date with the day's sums and their running totals.
+
+    Sums over any window of dates are the difference of two running-total rows,
+    so the app never rescans games. The spread error uses the half-point spread
+    and a game counts as a predicted underdog win when its probability is > 0.5.
+    """
+    played = df_display[df_display["Played"]]
+    err = played["Actual.Score.Diff"].to_numpy() - played["Predicted.Score.Diff"].to_numpy()
+    predicted = played["Predicted.Underdog.Win.Prob"].to_numpy() > 0.5
+    actual = played["Underdog.Win"].to_numpy() == 1
+
+    df_sums = pd.DataFrame({
+        "Date.Game": played["Date.Game"].to_numpy(),
+        "games": 1,
+        "sq_err": err ** 2,
+        "abs_err": np.abs(err),
+        "tp": predicted & actual,
+        "fp": predicted & ~actual,
+        "fn": ~predicted & actual,
+        "tn": ~predicted & ~actual,
+    })
+    ledger = df_sums.groupby("Date.Game", sort=True)[LEDGER_SUMS].sum()
+    ledger[["games", "tp", "fp", "fn", "tn"]] = ledger[["games", "tp", "fp", "fn", "tn"]].astype("int64")
+    running = ledger.cumsum().add_prefix("cum.")
+    return pd.concat([ledger, running], axis=1).reset_index()
+
+
+def frame_version(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()[:16]
+
+
+# -------------------------------
+# Save / load
+# -------------------------------
+def save_display(df_predictions, filename=DISPLAY_FILE):
+    """Build and atomically write the display artifact. Returns its version."""
+    df_display = build_display(df_predictions)
+    artifact = {
+        "schema": SCHEMA,
+        "version": frame_version(df_display),
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "games": df_display,
+        "ledger": metrics_ledger(df_display),
+    }
+    with open(filename + ".tmp", "wb") as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(filename + ".tmp", filename)
+    return artifact["version"]
+
+
+def load_display(filename=DISPLAY_FILE):
+    with open(filename, "rb") as f:
+        artifact = pickle.load(f)
+    if artifact.get("schema") != SCHEMA:
+        raise ValueError(f"{filename} has schema {artifact.get('schema')}, expected {SCHEMA}; rebuild it")
+    return artifact
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild the app's display artifact from the predictions file.")
+    parser.add_argument("--predictions", default=PREDICTIONS_FILE)
+    parser.add_argument("--out", default=DISPLAY_FILE)
+    args = parser.parse_args()
+
+    with open(args.predictions, "rb") as f:
+        df_predictions = pickle.load(f)
+    version = save_display(df_predictions, args.out)
+    print(f"Wrote {len(df_predictions)} games to {args.out} (version {version})")
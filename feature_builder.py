@@ -0,0 +1,188 @@
+import numpy as np
+import pandas as pd
+
+GAME_COLS = ["Date.Game", "Date.Stat", "Home", "Home.Points", "Away", "Away.Points"]
+
+
+# -------------------------------
+# Scores and team names
+# -------------------------------
+def map_scores(df_scores, name_map):
+    """Sports Reference scores -> GAME_COLS frame with TeamRankings team names.
+
+    Games with a team missing from the crosswalk are dropped.
+    """
+    df = df_scores.copy()
+    df["team_name_home"] = df["team_name_home"].map(name_map)
+    df["team_name_away"] = df["team_name_away"].map(name_map)
+    df = df.dropna(subset=["team_name_home", "team_name_away"])
+
+    df = df[["date_game", "date_stat", "team_name_home", "team_score_home", "team_name_away", "team_score_away"]].copy()
+    df.columns = GAME_COLS
+    df = df.astype({"Home": str, "Away": str})
+    return df.reset_index(drop=True)
+
+
+def map_injury_teams(injury_df_dict, name_map):
+    # Rename the team column of every injury frame in place
+    for date, df in injury_df_dict.items():
+        if "team" in df.columns:
+            df["team"] = df["team"].map(name_map)
+    return injury_df_dict
+
+
+# -------------------------------
+# Stats
+# -------------------------------
+def _long_frame(stats):
+    if isinstance(stats, dict):
+        frames = [df for df in stats.values() if df is not None]
+        stats = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["Date", "Team"])
+    stats = stats.copy()
+    stats["Date"] = stats["Date"].astype(str)
+    return stats
+
+
+def stack_stats(stats):
+    """Stack per-date stats into one long frame indexed by (Date, Team).
+
+    `stats` is either a {date: DataFrame} dict (as returned by
+    stats_store.load_stats_dict) or a long frame with Date and Team columns
+    (stats_store.load_stats). Teams that appear more than once on a date are
+    dropped, since their stats are ambiguous.
+    """
+    stats = _long_frame(stats)
+    ambiguous = stats.duplicated(["Date", "Team"], keep=False)
+    return stats[~ambiguous].set_index(["Date", "Team"]).sort_index()
+
+
+def stat_keys(date_stat, available):
+    # Stats date for each game as "YYYY-MM-DD"; games whose stats date has not been
+    # scraped use the latest available stats date
+    available = pd.Index(available)
+    keys = pd.to_datetime(date_stat).dt.strftime("%Y-%m-%d")
+    return keys.where(keys.isin(available), available.max())
+
+
+# -------------------------------
+# Games + stats
+# -------------------------------
+def build_master(df_games, stats_home, stats_away, verbose=True):
+    """Join home and away team stats onto games with two keyed joins.
+
+    df_games has the GAME_COLS columns; stats_home/stats_away are the output of
+    stack_stats(). Returns the games that have exactly one stats row for both
+    teams, with stats columns prefixed Home_ and Away_.
+    """
+    df = df_games.reset_index(drop=True).copy()
+    df["_key_home"] = stat_keys(df["Date.Stat"], stats_home.index.unique("Date"))
+    df["_key_away"] = stat_keys(df["Date.Stat"], stats_away.index.unique("Date"))
+
+    # A game is kept only when both teams have a stats row on their stats date
+    keep = (
+        pd.MultiIndex.from_arrays([df["_key_home"], df["Home"]]).isin(stats_home.index)
+        & pd.MultiIndex.from_arrays([df["_key_away"], df["Away"]]).isin(stats_away.index)
+    )
+
+    df = df.join(stats_home.add_prefix("Home_"), on=["_key_home", "Home"])
+    df = df.join(stats_away.add_prefix("Away_"), on=["_key_away", "Away"])
+
+    if verbose:
+        skipped = df.loc[~keep, ["Home", "Away", "_key_home"]]
+        for home_team, away_team, stat_key in skipped.itertuples(index=False):
+            print(f"⚠️ Skipping: {home_team} or {away_team} on {stat_key} has ambiguous or missing stats.")
+
+    df = df[keep].drop(columns=["_key_home", "_key_away"])
+    return df.reset_index(drop=True)
+
+
+# -------------------------------
+# Injuries
+# -------------------------------
+def injury_counts(injury_df_dict):
+    """Number of listed injuries per team per game date (Team, Injury.Count, Date.Game)."""
+    counts = []
+    for date, df in injury_df_dict.items():
+        if "team" in df.columns:
+            day = df["team"].value_counts().reset_index()
+            day.columns = ["Team", "Injury.Count"]
+            day["Date.Game"] = pd.to_datetime(date)
+            counts.append(day)
+    if not counts:
+        return pd.DataFrame(columns=["Team", "Injury.Count", "Date.Game"])
+    return pd.concat(counts, ignore_index=True)
+
+
+def add_injury_counts(df_master, df_injury_counts):
+    # Teams without a listed injury on the game date get 0
+    df = df_master.copy()
+    df["Date.Game"] = pd.to_datetime(df["Date.Game"])
+    df = pd.merge(
+        df,
+        df_injury_counts.rename(columns={"Team": "Home", "Injury.Count": "Home_Injury.Count"}),
+        on=["Date.Game", "Home"],
+        how="left"
+    )
+    df = pd.merge(
+        df,
+        df_injury_counts.rename(columns={"Team": "Away", "Injury.Count": "Away_Injury.Count"}),
+        on=["Date.Game", "Away"],
+        how="left"
+    )
+    df["Home_Injury.Count"] = df["Home_Injury.Count"].fillna(0).astype(int)
+    df["Away_Injury.Count"] = df["Away_Injury.Count"].fillna(0).astype(int)
+    return df
+
+
+# -------------------------------
+# Favorite/Underdog and targets
+# -------------------------------
+def add_matchup_columns(df_master, col="predictive-by-other"):
+    """Add Favorite/Underdog (higher/lower rating) and the Underdog.Win, Score.Diff
+    and Total.Pts targets, placed right after the game columns."""
+    df = df_master.copy()
+    home_fav = df[f"Home_{col}"] > df[f"Away_{col}"]
+    df.insert(6, "Favorite", np.where(home_fav, df["Home"], df["Away"]))
+    df.insert(7, "Underdog", np.where(home_fav, df["Away"], df["Home"]))
+
+    home_points = pd.to_numeric(df["Home.Points"], errors="coerce")
+    away_points = pd.to_numeric(df["Away.Points"], errors="coerce")
+    df["Home.Points"] = home_points
+    df["Away.Points"] = away_points
+    df.insert(8, "Underdog.Win", ((home_points < away_points) & (df["Underdog"] == df["Away"])).astype(int))
+    df.insert(9, "Score.Diff", home_points - away_points)
+    df.insert(10, "Total.Pts", home_points + away_points)
+    return df
+
+
+def build_game_rows(df_games, stats_home, stats_away, df_injury_counts, verbose=True):
+    """Full feature rows for games: stats join, injury counts, favorite/underdog and targets."""
+    df = build_master(df_games, stats_home, stats_away, verbose=verbose)
+    df = add_injury_counts(df, df_injury_counts)
+    return add_matchup_columns(df)
+
+
+# -------------------------------
+# Top-ranked filter
+# -------------------------------
+def rank_cutoffs(stats, col="predictive-by-other", top_n=200):
+    """Per stats date, the rating of the top_n-th best team (a Series indexed by date).
+
+    `stats` is a {date: DataFrame} dict or a long frame with a Date column. Dates
+    with fewer than top_n rated teams get no cutoff.
+    """
+    stats = _long_frame(stats)
+    ratings = stats.set_index("Date")[col].dropna().sort_values(ascending=False, kind="stable")
+    position = ratings.groupby(level="Date").cumcount()
+    return ratings[position.to_numpy() == top_n - 1].sort_index()
+
+
+def filter_top_ranked(df_master, cutoffs, col="predictive-by-other"):
+    """Keep games where the home or the away team is at or above its stats date's cutoff.
+
+    Games whose stats date has no cutoff are dropped.
+    """
+    stat_key = pd.to_datetime(df_master["Date.Stat"]).dt.strftime("%Y-%m-%d")
+    cutoff = stat_key.map(cutoffs)
+    keep = (df_master[f"Home_{col}"] >= cutoff) | (df_master[f"Away_{col}"] >= cutoff)
+    return df_master[keep].reset_index(drop=True)
@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import feature_builder
+import instrumentation
+import stats_store
+
+# -------------------------------
+# Config
+# -------------------------------
+# Built game rows, one Parquet file per game date, plus a manifest recording the
+# source data each date was built from:  feature_cache/2025-11-10.parquet
+CACHE_DIR = "feature_cache"
+MANIFEST = "manifest.json"
+
+# Bump when feature_builder changes how rows are built, to invalidate every date
+FEATURE_VERSION = 1
+
+
+def _date_path(date, cache_dir):
+    return os.path.join(cache_dir, f"{date}.parquet")
+
+
+def _hash_frame(df):
+    if df is None or df.empty:
+        return ""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes()).hexdigest()
+
+
+def _date_strings(values):
+    return pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+
+
+def load_manifest(cache_dir=CACHE_DIR):
+    path = os.path.join(cache_dir, MANIFEST)
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("version") == FEATURE_VERSION:
+            return manifest
+    return {"version": FEATURE_VERSION, "dates": {}}
+
+
+def save_manifest(manifest, cache_dir=CACHE_DIR):
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+# -------------------------------
+# Dependencies
+# -------------------------------
+def date_dependencies(df_games, df_injury_counts):
+    """Fingerprint of every input that feeds each game date's rows.
+
+    scores:     the date's game rows
+    stats_*:    the stats partitions (after the latest-date fallback) and their versions
+    injuries:   the date's injury counts
+    """
+    game_dates = _date_strings(df_games["Date.Game"])
+    injury_dates = _date_strings(df_injury_counts["Date.Game"])
+    stored = {side: stats_store.list_dates(side) for side in stats_store.SIDES}
+
+    deps = {}
+    for date, games in df_games.groupby(game_dates.to_numpy(), sort=True):
+        entry = {"scores": _hash_frame(games[feature_builder.GAME_COLS])}
+        for side in stats_store.SIDES:
+            keys = sorted(set(feature_builder.stat_keys(games["Date.Stat"], stored[side]).dropna()))
+            entry[f"stats_{side}"] = {key: stats_store.partition_fingerprint(side, key) for key in keys}
+        entry["injuries"] = _hash_frame(df_injury_counts[(injury_dates == date).to_numpy()])
+        deps[date] = entry
+    return deps
+
+
+# -------------------------------
+# Build
+# -------------------------------
+def build_features_cached(df_games, df_injury_counts, cache_dir=CACHE_DIR, verbose=True):
+    """Same rows as feature_builder.build_game_rows(), rebuilding only changed dates.
+
+    A game date is rebuilt when its scores, the stats partitions it uses or its
+    injury counts differ from the manifest; only the stats partitions those dates
+    need are read. Rows come back in df_games order.
+    """
+    manifest = load_manifest(cache_dir)
+    deps = date_dependencies(df_games, df_injury_counts)
+
+    dirty = [
+        date for date, entry in deps.items()
+        if manifest["dates"].get(date, {}).get("deps") != entry
+        or (manifest["dates"][date]["rows"] > 0 and not os.path.exists(_date_path(date, cache_dir)))
+    ]
+
+    # Dates no longer present in the scores
+    for date in [d for d in manifest["dates"] if d not in deps]:
+        if os.path.exists(_date_path(date, cache_dir)):
+            os.remove(_date_path(date, cache_dir))
+        del manifest["dates"][date]
+
+    if verbose:
+        print(f"Feature cache: {len(deps) - len(dirty)} dates cached, {len(dirty)} to build")
+
+    if dirty:
+        game_dates = _date_strings(df_games["Date.Game"])
+        games = df_games[game_dates.isin(dirty).to_numpy()]
+        stats = {}
+        for side in stats_store.SIDES:
+            needed = sorted(set().union(*(deps[d][f"stats_{side}"] for d in dirty)))
+            stats[side] = feature_builder.stack_stats(stats_store.load_stats(side, dates=needed))
+
+        rows = feature_builder.build_game_rows(games, stats["home"], stats["away"], df_injury_counts, verbose)
+        instrumentation.record_rows("feature_rows_built", len(rows))
+        row_dates = _date_strings(rows["Date.Game"])
+
+        os.makedirs(cache_dir, exist_ok=True)
+        for date in dirty:
+            day = rows[(row_dates == date).to_numpy()]
+            path = _date_path(date, cache_dir)
+            if day.empty:
+                if os.path.exists(path):
+                    os.remove(path)
+            else:
+                pq.write_table(pa.Table.from_pandas(day, preserve_index=False), path + ".tmp")
+                os.replace(path + ".tmp", path)
+            manifest["dates"][date] = {"deps": deps[date], "rows": len(day)}
+
+    save_manifest(manifest, cache_dir)
+    return load_cached(df_games, cache_dir, manifest)
+
+
+def load_cached(df_games, cache_dir=CACHE_DIR, manifest=None):
+    manifest = manifest or load_manifest(cache_dir)
+    dates = sorted(d for d, entry in manifest["dates"].items() if entry["rows"] > 0)
+    frames = [pq.read_table(_date_path(d, cache_dir), memory_map=True).to_pandas() for d in dates]
+    if not frames:
+        return pd.DataFrame()
+    df = pd.concat(frames, ignore_index=True)
+
+    # Restore the order of df_games
+    order = pd.DataFrame({
+        "_date": _date_strings(df_games["Date.Game"]).to_numpy(),
+        "Home": df_games["Home"].to_numpy(),
+        "Away": df_games["Away"].to_numpy(),
+        "_order": np.arange(len(df_games)),
+    }).drop_duplicates(["_date", "Home", "Away"])
+    df["_date"] = _date_strings(df["Date.Game"]).to_numpy()
+    df = df.merge(order, on=["_date", "Home", "Away"], how="left")
+    df = df.sort_values("_order", kind="stable").drop(columns=["_date", "_order"])
+    return df.reset_index(drop=True)
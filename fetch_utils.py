@@ -0,0 +1,205 @@
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import instrumentation
+
+# -------------------------------
+# Config
+# -------------------------------
+MAX_WORKERS = 8          # concurrent requests in flight
+PARSE_WORKERS = os.cpu_count() or 1   # parser processes
+POOL_SIZE = 16           # keep-alive connections kept per host
+MAX_RETRIES = 4          # retries after the first attempt
+BACKOFF_BASE = 1.0       # seconds, doubled on every retry
+BACKOFF_MAX = 30.0
+TIMEOUT = 30
+
+# Minimum seconds between two requests to the same host
+HOST_MIN_INTERVAL = {
+    "www.teamrankings.com": 0.25,
+    "www.sports-reference.com": 3.0,
+    "www.covers.com": 0.5,
+}
+DEFAULT_MIN_INTERVAL = 0.5
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+# -------------------------------
+# Rate limiting
+# -------------------------------
+class HostRateLimiter:
+    """Spaces requests to each host at least `min_interval` seconds apart."""
+
+    def __init__(self, intervals=None, default=DEFAULT_MIN_INTERVAL):
+        self.intervals = dict(HOST_MIN_INTERVAL if intervals is None else intervals)
+        self.default = default
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, host):
+        interval = self.intervals.get(host, self.default)
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+rate_limiter = HostRateLimiter()
+
+
+class TokenBucket:
+    """Global rate limit: `rate` requests per second with bursts of up to `capacity`."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, host=None):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+# -------------------------------
+# Shared session (keep-alive pool)
+# -------------------------------
+_session = None
+_session_lock = threading.Lock()
+
+
+def make_session(pool_size=POOL_SIZE):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = make_session()
+        return _session
+
+
+def _backoff(attempt, retry_after=None):
+    if retry_after is not None:
+        try:
+            return min(float(retry_after), BACKOFF_MAX)
+        except ValueError:
+            pass
+    return min(BACKOFF_BASE * 2 ** attempt, BACKOFF_MAX) + random.uniform(0, BACKOFF_BASE)
+
+
+# -------------------------------
+# Fetching
+# -------------------------------
+def fetch(url, headers=None, session=None, timeout=TIMEOUT, limiter=None):
+    """GET `url` through the shared session with rate limiting and retry with backoff.
+
+    `limiter` (e.g. a TokenBucket) replaces the default per-host spacing. Returns
+    the last response received (callers check the status), or raises the last
+    connection error if no response was ever received.
+    """
+    session = session or get_session()
+    limiter = limiter or rate_limiter
+    host = urlparse(url).netloc
+    response = None
+    start = time.perf_counter()
+
+    for attempt in range(MAX_RETRIES + 1):
+        limiter.wait(host)
+        try:
+            response = session.get(url, headers=headers, timeout=timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            if attempt == MAX_RETRIES:
+                instrumentation.record_request(url, None, time.perf_counter() - start, 0, attempt)
+                raise
+            print(f"Retrying {url} after error: {e}")
+            time.sleep(_backoff(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUS or attempt == MAX_RETRIES:
+            break
+
+        print(f"Retrying {url} after HTTP {response.status_code}")
+        time.sleep(_backoff(attempt, response.headers.get("Retry-After")))
+
+    # Latency includes rate-limit waits and backoff: it is what the caller waited
+    instrumentation.record_request(url, response.status_code, time.perf_counter() - start,
+                                   len(response.content), attempt)
+    return response
+
+
+def run_concurrent(items, func, max_workers=MAX_WORKERS):
+    """Call `func(item)` for every item on a bounded thread pool.
+
+    Yields (item, result, error) tuples as calls complete; exactly one of result
+    and error is set.
+    """
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(func, item): item for item in items}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                yield item, future.result(), None
+            except Exception as e:
+                yield item, None, e
+
+
+def fetch_then_parse(items, fetch_func, parse_func, max_workers=MAX_WORKERS, parse_workers=PARSE_WORKERS):
+    """Two-stage pipeline: `fetch_func(item)` on a thread pool, `parse_func(item, payload)` on a process pool.
+
+    Each payload is handed to the parse pool as soon as its fetch completes, so
+    parsing runs on every core while requests are still in flight. `parse_func`
+    must be a module-level function and payloads must be picklable. Yields
+    (item, result, error) tuples as parses complete; a failed fetch is yielded
+    with its error and never parsed.
+    """
+    # Spawned workers never inherit locks held by the fetch threads
+    with ThreadPoolExecutor(max_workers=max_workers) as fetchers, \
+         ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context("spawn")) as parsers:
+        fetching = {fetchers.submit(fetch_func, item): item for item in items}
+        parsing = {}
+        while fetching or parsing:
+            done, _ = wait(list(fetching) + list(parsing), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future in fetching:
+                    item = fetching.pop(future)
+                    try:
+                        payload = future.result()
+                    except Exception as e:
+                        yield item, None, e
+                        continue
+                    parsing[parsers.submit(parse_func, item, payload)] = item
+                    continue
+
+                item = parsing.pop(future)
+                try:
+                    result, error = future.result(), None
+                except Exception as e:
+                    result, error = None, e
+                yield item, result, error
@@ -0,0 +1,268 @@
+import os
+import re
+from datetime import timedelta
+
+import pandas as pd
+from bs4 import BeautifulSoup
+
+import stats_store
+
+# Optional C-backed parsers; html.parser through BeautifulSoup is always available
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+try:
+    import lxml.html
+except ImportError:
+    lxml = None
+
+# Every parser here takes raw HTML and touches no network, so it can run in the
+# parse process pool or over pages replayed from the HTTP archive.
+
+# -------------------------------
+# Config
+# -------------------------------
+STATS_TABLE_CLASS = "tr-table datatable scrollable"
+
+BACKENDS = ["bs4"] + (["lxml"] if lxml is not None else []) + (["selectolax"] if HTMLParser is not None else [])
+
+# Fastest available backend unless NCAAB_HTML_BACKEND says otherwise
+DEFAULT_BACKEND = os.environ.get("NCAAB_HTML_BACKEND", BACKENDS[-1])
+
+_TABLE_TAG = re.compile(r"<(/?)table\b[^>]*>", re.IGNORECASE)
+
+
+# -------------------------------
+# Streaming: cut the stats table out of the page
+# -------------------------------
+def extract_table_fragment(html, table_class=STATS_TABLE_CLASS):
+    """Return just the `<table class="...">...</table>` markup, or None.
+
+    Scanning for the table tags is much cheaper than tokenizing the whole page,
+    so backends only ever parse the table itself.
+    """
+    depth, start = 0, None
+    for match in _TABLE_TAG.finditer(html):
+        closing = match.group(1) == "/"
+        if start is None:
+            if not closing and re.search(r'class\s*=\s*["\']' + re.escape(table_class) + r'["\']', match.group(0)):
+                start, depth = match.start(), 1
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return html[start:match.end()]
+    return None
+
+
+# -------------------------------
+# Backends: html -> (headers, rows) of cell text
+# -------------------------------
+# Cell text follows BeautifulSoup's get_text(strip=True): every text node is
+# stripped and the non-empty pieces are joined without a separator.
+def _bs4_table(html, table_class):
+    soup = BeautifulSoup(html, "html.parser")
+    table = soup.find("table", class_=table_class)
+    if not table:
+        return None
+    headers = [th.get_text(strip=True) for th in table.find_all("th")]
+    rows = [[cell.get_text(strip=True) for cell in tr.find_all(["td", "th"])] for tr in table.find_all("tr")]
+    return headers, rows
+
+
+def _lxml_text(element):
+    # Text and tails in document order; comment nodes contribute only their tail
+    pieces = []
+
+    def walk(node):
+        if isinstance(node.tag, str) and node.text:
+            pieces.append(node.text.strip())
+        for child in node:
+            walk(child)
+            if child.tail:
+                pieces.append(child.tail.strip())
+
+    walk(element)
+    return "".join(pieces)
+
+
+def _lxml_table(html, table_class):
+    root = lxml.html.fromstring(html)
+    if root.tag == "table" and root.get("class") == table_class:
+        table = root
+    else:
+        tables = root.xpath(f'//table[@class="{table_class}"]')
+        if not tables:
+            return None
+        table = tables[0]
+    headers = [_lxml_text(th) for th in table.iter("th")]
+    rows = [[_lxml_text(cell) for cell in tr.iter("td", "th")] for tr in table.iter("tr")]
+    return headers, rows
+
+
+def _selectolax_table(html, table_class):
+    tree = HTMLParser(html)
+    table = next((node for node in tree.css("table") if node.attributes.get("class") == table_class), None)
+    if table is None:
+        return None
+    headers = [th.text(deep=True, separator="", strip=True) for th in table.css("th")]
+    rows = [
+        [cell.text(deep=True, separator="", strip=True) for cell in tr.traverse() if cell.tag in ("td", "th")]
+        for tr in table.css("tr")
+    ]
+    return headers, rows
+
+
+_PARSERS = {"bs4": _bs4_table, "lxml": _lxml_table, "selectolax": _selectolax_table}
+
+
+def parse_table(html, backend=None, streaming=True, table_class=STATS_TABLE_CLASS):
+    """Parse the TeamRankings stats table in `html` into a DataFrame of cell text.
+
+    Returns None when the page has no such table. Every backend, with or without
+    streaming, returns the same frame.
+    """
+    backend = backend or DEFAULT_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"HTML backend {backend!r} is not available; choose from {BACKENDS}")
+
+    if streaming:
+        html = extract_table_fragment(html, table_class)
+        if html is None:
+            return None
+
+    parsed = _PARSERS[backend](html, table_class)
+    if parsed is None:
+        return None
+
+    headers, rows = parsed
+    # The header row comes back as a row of <th> cells; keep only data rows
+    rows = [row for row in rows if row and row != headers]
+    return pd.DataFrame(rows, columns=headers if headers else None)
+
+
+# -------------------------------
+# TeamRankings stats pages
+# -------------------------------
+def parse_stats_page(html, backend=None):
+    """Stats table with every column except Team converted to float32, or None."""
+    df = parse_table(html, backend=backend)
+    if df is None:
+        return None
+
+    # Everything except the team name is numeric: "45.3%" -> 45.3, "--" -> NaN
+    for col in df.columns:
+        if col != "Team":
+            df[col] = stats_store.parse_numeric(df[col])
+    return df
+
+
+# -------------------------------
+# Sports Reference box scores
+# -------------------------------
+WOMENS_GAME = ["Women's", "Womens", "WBIT", "WNIT"]
+
+
+def parse_scores_page(html, date):
+    """One row per men's game on a Sports Reference boxscores page for `date`."""
+    soup = BeautifulSoup(html, "html.parser")
+    teams = soup.select(".teams")
+
+    daily_scores = []
+
+    for t in teams:
+        try:
+            rows = t.select("tr")
+
+            # if rows[2] contains "Women's", skip it
+            gender_row = rows[2]
+            gender = gender_row.select_one("td").text
+            if any(g in gender for g in WOMENS_GAME):
+                continue
+
+            away_row = rows[0]
+            home_row = rows[1]
+
+            team_name_away = away_row.select_one("td a").text
+            team_name_home = home_row.select_one("td a").text
+
+            try:
+                team_score_away = int(away_row.select("td")[1].text)
+                team_score_home = int(home_row.select("td")[1].text)
+            except:
+                print(f"Scores not available for {team_name_away} vs {team_name_home} on {date}")
+                team_score_away = None
+                team_score_home = None
+
+            daily_scores.append({
+                "date_game": date,
+                "date_stat": date - timedelta(days=1),
+                "team_name_home": team_name_home,
+                "team_score_home": team_score_home,
+                "team_name_away": team_name_away,
+                "team_score_away": team_score_away
+            })
+        except Exception as e:
+            print(f"Error parsing game: {e}")
+            continue
+
+    return pd.DataFrame(daily_scores)
+
+
+# -------------------------------
+# Covers.com matchups and injury reports
+# -------------------------------
+def parse_matchup_ids(html):
+    soup = BeautifulSoup(html, "html.parser")
+    matchup_ids = set()
+    for link in soup.find_all("a", href=True):
+        match = re.search(r"/sport/basketball/ncaab/matchup/(\d+)", link["href"])
+        if match:
+            matchup_ids.add(int(match.group(1)))
+    return sorted(matchup_ids)
+
+
+def parse_injury_report(html, matchup_id):
+    soup = BeautifulSoup(html, "html.parser")
+
+    injuries_block = soup.find("div", id="injuries")
+    if not injuries_block:
+        return []
+
+    def extract_team_injuries(section_class):
+        section = injuries_block.find("section", class_=section_class)
+        if not section:
+            return []
+
+        team_name_tag = section.find("h2")
+        team_name = team_name_tag.get_text(strip=True).replace("Injuries", "").strip() if team_name_tag else "Unknown Team"
+        if team_name.endswith("'s"):
+            team_name = team_name[:-2]
+
+        table = section.find("table")
+        if not table:
+            return []
+
+        rows = table.find_all("tr")[1:]  # skip header
+        injuries = []
+        for row in rows:
+            cols = row.find_all("td")
+            if len(cols) == 1 and "No injuries" in cols[0].get_text():
+                return []
+            elif len(cols) == 5:
+                injuries.append({
+                    "matchup_id": matchup_id,
+                    "team": team_name,
+                    "player": cols[0].get_text(strip=True),
+                    "position": cols[1].get_text(strip=True),
+                    "status": cols[2].get_text(strip=True),
+                    "date": cols[3].get_text(strip=True),
+                    "note": cols[4].get_text(strip=True)
+                })
+        return injuries
+
+    away_injuries = extract_team_injuries("away-team-section")
+    home_injuries = extract_team_injuries("home-team-section")
+
+    return away_injuries + home_injuries
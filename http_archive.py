@@ -0,0 +1,149 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime, timezone
+from urllib.parse import urldefrag, urlsplit
+
+from fetch_utils import HostRateLimiter, fetch
+
+# -------------------------------
+# Config
+# -------------------------------
+# http_archive/blobs/<ab>/<sha256>.gz        gzip'd response bodies, stored once per distinct content
+# http_archive/index/<host>/<sha1>.jsonl     one line per capture of a URL: fetch time, status,
+#                                            headers and the body's sha256
+ARCHIVE_DIR = "http_archive"
+
+# NCAAB_REPLAY=1 makes every scraper read from the archive instead of the network;
+# NCAAB_REPLAY_AS_OF (ISO date or time, UTC) replays the captures as they were then
+REPLAY = os.environ.get("NCAAB_REPLAY", "") == "1"
+REPLAY_AS_OF = os.environ.get("NCAAB_REPLAY_AS_OF")
+
+# NCAAB_STANDIN=http://127.0.0.1:8765 sends every request to archive_server.py instead
+# of the real sites; those responses are not archived again
+STANDIN = os.environ.get("NCAAB_STANDIN")
+_standin_limiter = HostRateLimiter({}, default=0)
+
+# What the fetch stage hands to the parse stage (picklable, unlike a Response)
+Page = namedtuple("Page", ["url", "status", "text", "headers"])
+
+_index_lock = threading.Lock()
+
+
+def url_key(url):
+    # The fragment never reaches the server, so it is not part of a capture's identity
+    return urldefrag(url)[0]
+
+
+def index_path(url, root=ARCHIVE_DIR):
+    key = url_key(url)
+    digest = hashlib.sha1(key.encode("utf-8")).hexdigest()
+    return os.path.join(root, "index", urlsplit(key).netloc, f"{digest}.jsonl")
+
+
+def blob_path(digest, root=ARCHIVE_DIR):
+    return os.path.join(root, "blobs", digest[:2], f"{digest}.gz")
+
+
+def parse_time(value):
+    when = datetime.fromisoformat(value)
+    return when if when.tzinfo else when.replace(tzinfo=timezone.utc)
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+def store_blob(body, root=ARCHIVE_DIR):
+    digest = hashlib.sha256(body).hexdigest()
+    path = blob_path(digest, root)
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with gzip.open(tmp_path, "wb") as f:
+            f.write(body)
+        os.replace(tmp_path, path)
+    return digest
+
+
+def record(url, status, headers, body, encoding=None, fetched_at=None, root=ARCHIVE_DIR):
+    """Archive one response; identical bodies share a single blob."""
+    entry = {
+        "url": url_key(url),
+        "fetched_at": fetched_at or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "status": status,
+        "headers": {k.lower(): v for k, v in headers.items()},
+        "encoding": encoding,
+        "blob": store_blob(body, root),
+    }
+    path = index_path(url, root)
+    with _index_lock:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+    return entry
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def captures(url, root=ARCHIVE_DIR):
+    path = index_path(url, root)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def lookup(url, as_of=None, root=ARCHIVE_DIR):
+    """Latest capture of `url` that has a body (not a 304), at or before `as_of` if given."""
+    as_of = parse_time(as_of) if as_of else None
+    found = None
+    for entry in captures(url, root):
+        if entry["status"] == 304 or (as_of and parse_time(entry["fetched_at"]) > as_of):
+            continue
+        if found is None or entry["fetched_at"] >= found["fetched_at"]:
+            found = entry
+    return found
+
+
+def load_body(entry, root=ARCHIVE_DIR):
+    with gzip.open(blob_path(entry["blob"], root), "rb") as f:
+        return f.read()
+
+
+def load_page(url, as_of=None, root=ARCHIVE_DIR):
+    entry = lookup(url, as_of, root)
+    if entry is None:
+        return None
+    text = load_body(entry, root).decode(entry.get("encoding") or "utf-8", errors="replace")
+    return Page(url, entry["status"], text, entry["headers"])
+
+
+# -------------------------------
+# Fetching
+# -------------------------------
+def standin_url(url, base=None):
+    # https://host/path?query -> <base>/host/path?query
+    parts = urlsplit(url)
+    return f"{(base or STANDIN).rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+def fetch_page(url, headers=None, limiter=None, replay=None):
+    """Fetch `url` as a Page, archiving the response; in replay mode, read it from the archive.
+
+    A URL with no usable capture replays as a 404.
+    """
+    if REPLAY if replay is None else replay:
+        page = load_page(url, REPLAY_AS_OF)
+        return page if page is not None else Page(url, 404, "", {})
+
+    if STANDIN:
+        response = fetch(standin_url(url), headers=headers, limiter=_standin_limiter)
+    else:
+        response = fetch(url, headers=headers, limiter=limiter)
+        record(url, response.status_code, response.headers, response.content, response.encoding)
+    # Header names are lower-cased so lookups do not depend on the server's casing
+    return Page(url, response.status_code, response.text, {k.lower(): v for k, v in response.headers.items()})
@@ -1,125 +1,169 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import re
 import pickle
-from datetime import datetime, timedelta
-import time
+from datetime import datetime
+import json
 import os
 
-HEADERS = {"User-Agent": "Mozilla/5.0"}
+from fetch_utils import TokenBucket, fetch_then_parse
+import html_parsing
+import instrumentation
+from http_archive import fetch_page
 
-def get_matchup_ids(date_str):
-    url = f"https://www.covers.com/sports/ncaab/matchups?selectedDate={date_str}"
-    try:
-        response = requests.get(url, headers=HEADERS)
-        soup = BeautifulSoup(response.text, "html.parser")
-        links = soup.find_all("a", href=True)
-
-        matchup_ids = set()
-        for link in links:
-            match = re.search(r"/sport/basketball/ncaab/matchup/(\d+)", link["href"])
-            if match:
-                matchup_ids.add(int(match.group(1)))
-
-        return sorted(matchup_ids)
-    except Exception as e:
-        print(f"Error fetching matchup IDs for {date_str}: {e}")
-        return []
-
-def get_injury_report(matchup_id):
-    url = f"https://www.covers.com/sport/basketball/ncaab/matchup/{matchup_id}#injuries"
-    try:
-        res = requests.get(url, headers=HEADERS)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        injuries_block = soup.find("div", id="injuries")
-        if not injuries_block:
-            return []
-
-        def extract_team_injuries(section_class):
-            section = injuries_block.find("section", class_=section_class)
-            if not section:
-                return []
-
-            team_name_tag = section.find("h2")
-            team_name = team_name_tag.get_text(strip=True).replace("Injuries", "").strip() if team_name_tag else "Unknown Team"
-            if team_name.endswith("'s"):
-                team_name = team_name[:-2]
-
-            table = section.find("table")
-            if not table:
-                return []
-
-            rows = table.find_all("tr")[1:]  # skip header
-            injuries = []
-            for row in rows:
-                cols = row.find_all("td")
-                if len(cols) == 1 and "No injuries" in cols[0].get_text():
-                    return []
-                elif len(cols) == 5:
-                    injuries.append({
-                        "matchup_id": matchup_id,
-                        "team": team_name,
-                        "player": cols[0].get_text(strip=True),
-                        "position": cols[1].get_text(strip=True),
-                        "status": cols[2].get_text(strip=True),
-                        "date": cols[3].get_text(strip=True),
-                        "note": cols[4].get_text(strip=True)
-                    })
-            return injuries
-
-        away_injuries = extract_team_injuries("away-team-section")
-        home_injuries = extract_team_injuries("home-team-section")
-
-        return away_injuries + home_injuries
-
-    except Exception as e:
-        print(f"Error scraping matchup {matchup_id}: {e}")
-        return []
+HEADERS = {"User-Agent": "Mozilla/5.0"}
 
 # -------------------------------
-# Load existing dataset if present
+# Config
 # -------------------------------
-filename = "ncaab_injury_dataframes_2025_2026.rds"
-if os.path.exists(filename):
-    with open(filename, "rb") as f:
-        injury_df_dict = pickle.load(f)
-else:
-    injury_df_dict = {}
+# One global rate limit for covers.com shared by all worker threads
+COVERS_RATE = 2.0      # requests per second
+COVERS_BURST = 4
+covers_limiter = TokenBucket(COVERS_RATE, COVERS_BURST)
 
-# -------------------------------
-# Scrape only missing dates
-# -------------------------------
-start_date = datetime(2025, 11, 10)
-end_date = datetime.today()
-current = start_date
+# injury_cache/matchups.json          {date: [matchup ids]}, [] records an off-day
+# injury_cache/reports/<id>.json      parsed injuries plus the ETag/Last-Modified they came from
+CACHE_DIR = "injury_cache"
+MATCHUPS_FILE = os.path.join(CACHE_DIR, "matchups.json")
+REPORTS_DIR = os.path.join(CACHE_DIR, "reports")
 
-while current <= end_date:
-    date_str = current.strftime("%Y-%m-%d")
 
-    if date_str in injury_df_dict and not injury_df_dict[date_str].empty:
-        print(f"Skipping {date_str}, already scraped.")
-    else:
-        print(f"Scraping injuries for {date_str}...")
-        matchup_ids = get_matchup_ids(date_str)
+# -------------------------------
+# Cache helpers
+# -------------------------------
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
 
-        daily_records = []
-        for matchup_id in matchup_ids:
-            print(f"Matchup {matchup_id}")
-            records = get_injury_report(matchup_id)
-            daily_records.extend(records)
-            time.sleep(1.5)  # polite delay
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(path + ".tmp", path)
 
-        injury_df_dict[date_str] = pd.DataFrame(daily_records)
+def report_cache_path(matchup_id):
+    return os.path.join(REPORTS_DIR, f"{matchup_id}.json")
 
-    current += timedelta(days=1)
 
 # -------------------------------
-# Save updated dataset
+# Fetch and parse stages
 # -------------------------------
-with open(filename, "wb") as f:
-    pickle.dump(injury_df_dict, f)
-
-print("\n Updated injury DataFrame dictionary saved to", filename)
\ No newline at end of file
+# Fetchers run on threads and archive every response (http_archive); the parse
+# functions run in worker processes (they must stay at module level).
+# NCAAB_REPLAY=1 re-parses archived pages without touching the network.
+def matchups_url(date_str):
+    return f"https://www.covers.com/sports/ncaab/matchups?selectedDate={date_str}"
+
+def report_url(matchup_id):
+    return f"https://www.covers.com/sport/basketball/ncaab/matchup/{matchup_id}#injuries"
+
+def fetch_matchups_page(date_str):
+    page = fetch_page(matchups_url(date_str), headers=HEADERS, limiter=covers_limiter)
+    if page.status != 200:
+        raise RuntimeError(f"HTTP {page.status} for {page.url}")
+    return page.text
+
+def parse_matchups_page(date_str, html):
+    return html_parsing.parse_matchup_ids(html)
+
+def fetch_report_page(matchup):
+    # Conditional request against the cached copy: a 304 reuses the parsed injuries
+    date_str, matchup_id = matchup
+    cached = load_json(report_cache_path(matchup_id), None)
+    headers = dict(HEADERS)
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    page = fetch_page(report_url(matchup_id), headers=headers, limiter=covers_limiter)
+    if page.status not in (200, 304):
+        raise RuntimeError(f"HTTP {page.status} for {page.url}")
+    return page
+
+def parse_report_page(matchup, page):
+    # New report cache entry, or None when the cached one is still current
+    date_str, matchup_id = matchup
+    if page.status == 304:
+        return None
+    return {
+        "etag": page.headers.get("etag"),
+        "last_modified": page.headers.get("last-modified"),
+        "records": html_parsing.parse_injury_report(page.text, matchup_id),
+    }
+
+def main():
+    # -------------------------------
+    # Load existing dataset if present
+    # -------------------------------
+    filename = "ncaab_injury_dataframes_2025_2026.rds"
+    if os.path.exists(filename):
+        with open(filename, "rb") as f:
+            injury_df_dict = pickle.load(f)
+    else:
+        injury_df_dict = {}
+
+    matchup_cache = load_json(MATCHUPS_FILE, {})
+
+    # -------------------------------
+    # Scrape only missing dates
+    # -------------------------------
+    start_date = datetime(2025, 11, 10)
+    end_date = datetime.today()
+    today_str = end_date.strftime("%Y-%m-%d")
+    all_dates = [d.strftime("%Y-%m-%d") for d in pd.date_range(start_date, end_date)]
+
+    dates_to_scrape = []
+    for date_str in all_dates:
+        if date_str in injury_df_dict and not injury_df_dict[date_str].empty:
+            print(f"Skipping {date_str}, already scraped.")
+        elif date_str < today_str and matchup_cache.get(date_str) == []:
+            print(f"Skipping {date_str}, no games that day.")
+            injury_df_dict.setdefault(date_str, pd.DataFrame())
+        else:
+            dates_to_scrape.append(date_str)
+
+    # Matchup ids: past dates come from the cache, today is always refreshed
+    dates_to_list = [d for d in dates_to_scrape if d == today_str or d not in matchup_cache]
+    for date_str, matchup_ids, error in fetch_then_parse(dates_to_list, fetch_matchups_page, parse_matchups_page):
+        if error is not None:
+            print(f"Error fetching matchup IDs for {date_str}: {error}")
+            continue
+        print(f"Found {len(matchup_ids)} matchups for {date_str}")
+        matchup_cache[date_str] = matchup_ids
+    save_json(MATCHUPS_FILE, matchup_cache)
+
+    # Injury reports for every matchup of every date, fetched concurrently
+    matchups = [(date_str, matchup_id) for date_str in dates_to_scrape for matchup_id in matchup_cache.get(date_str, [])]
+    daily_records = {date_str: [] for date_str in dates_to_scrape if date_str in matchup_cache}
+    for (date_str, matchup_id), report, error in fetch_then_parse(matchups, fetch_report_page, parse_report_page):
+        print(f"Matchup {matchup_id}")
+        if error is not None:
+            print(f"Error scraping matchup {matchup_id}: {error}")
+        if report is not None:
+            save_json(report_cache_path(matchup_id), report)
+        else:
+            report = load_json(report_cache_path(matchup_id), {"records": []})
+        daily_records[date_str].extend(report["records"])
+
+    instrumentation.record_rows("injury_records", sum(len(records) for records in daily_records.values()))
+
+    for date_str, records in daily_records.items():
+        # Keep the matchup order stable regardless of completion order
+        order = {matchup_id: i for i, matchup_id in enumerate(matchup_cache[date_str])}
+        records = sorted(records, key=lambda r: order.get(r["matchup_id"], len(order)))
+        injury_df_dict[date_str] = pd.DataFrame(records)
+
+    # -------------------------------
+    # Save updated dataset
+    # -------------------------------
+    with open(filename, "wb") as f:
+        pickle.dump(injury_df_dict, f)
+
+    print("\n Updated injury DataFrame dictionary saved to", filename)
+
+
+# Parse workers re-import this module, so the scraping only runs as a script
+if __name__ == "__main__":
+    with instrumentation.stage("scrape_injuries"):
+        main()
@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# -------------------------------
+# Config
+# -------------------------------
+# Events are appended as JSON lines to the file named by NCAAB_METRICS_FILE;
+# run_pipeline.py points it at pipeline_metrics_<timestamp>.jsonl next to its log.
+# With the variable unset every call below is a no-op.
+METRICS_ENV = "NCAAB_METRICS_FILE"
+
+_lock = threading.Lock()
+
+
+def metrics_file():
+    return os.environ.get(METRICS_ENV)
+
+
+def emit(event, **fields):
+    path = metrics_file()
+    if not path:
+        return
+    record = {
+        "ts": datetime.now().isoformat(timespec="milliseconds"),
+        "event": event,
+        "source": os.path.basename(sys.argv[0]) or "python",
+        "pid": os.getpid(),
+        **fields,
+    }
+    line = json.dumps(record, default=str) + "\n"
+    with _lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+# -------------------------------
+# Measurements
+# -------------------------------
+def peak_rss_mb():
+    # Peak resident memory of this process so far
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def children_cpu_seconds():
+    # CPU time of finished child processes (parse workers, subprocess stages)
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def record_request(url, status, seconds, nbytes, retries):
+    emit("request", url=url, host=url.split("/")[2] if "://" in url else "", status=status,
+         seconds=round(seconds, 4), bytes=nbytes, retries=retries)
+
+
+def record_rows(kind, rows):
+    emit("rows", kind=kind, rows=int(rows))
+
+
+@contextmanager
+def stage(name):
+    """Time a block: wall, CPU (this process and its finished children) and peak RSS."""
+    start_wall = time.perf_counter()
+    start_cpu = time.process_time()
+    start_children = children_cpu_seconds()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        emit("stage", stage=name, ok=ok,
+             wall_s=round(time.perf_counter() - start_wall, 3),
+             cpu_s=round(time.process_time() - start_cpu, 3),
+             children_cpu_s=round(children_cpu_seconds() - start_children, 3),
+             peak_rss_mb=peak_rss_mb())
+
+
+# -------------------------------
+# Report
+# -------------------------------
+def load_events(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else 0.0
+
+
+def summary_report(path):
+    """Text summary of one run: where the time and memory went, per stage and per host."""
+    events = load_events(path)
+    lines = [f"Run metrics from {path}"]
+
+    stages = [e for e in events if e["event"] == "stage"]
+    if stages:
+        lines.append("\n Stages                          wall s     cpu s  child cpu s  peak RSS MB")
+        for e in stages:
+            flag = "" if e.get("ok", True) else "  (failed)"
+            rss = "" if e.get("peak_rss_mb") is None else f"{e['peak_rss_mb']:.0f}"
+            lines.append(f" {e['stage']:<30}{e['wall_s']:>8.1f}{e['cpu_s']:>10.1f}{e['children_cpu_s']:>13.1f}{rss:>13}{flag}")
+
+    requests = [e for e in events if e["event"] == "request"]
+    if requests:
+        lines.append("\n Requests by host                 count       MB   mean ms    p95 ms  retries  errors")
+        for host in sorted({e["host"] for e in requests}):
+            rows = [e for e in requests if e["host"] == host]
+            latencies = [e["seconds"] * 1000 for e in rows]
+            errors = sum(1 for e in rows if e["status"] is None or e["status"] >= 400)
+            lines.append(
+                f" {host:<30}{len(rows):>8}{sum(e['bytes'] for e in rows) / 1e6:>9.1f}"
+                f"{sum(latencies) / len(latencies):>10.0f}{_percentile(latencies, 0.95):>10.0f}"
+                f"{sum(e['retries'] for e in rows):>9}{errors:>8}"
+            )
+
+    rows = [e for e in events if e["event"] == "rows"]
+    if rows:
+        lines.append("\n Rows")
+        totals = {}
+        for e in rows:
+            totals[e["kind"]] = totals.get(e["kind"], 0) + e["rows"]
+        for kind, total in totals.items():
+            lines.append(f" {kind:<30}{total:>10}")
+
+    if len(lines) == 1:
+        lines.append(" (no events recorded)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize a pipeline_metrics_*.jsonl file.")
+    parser.add_argument("metrics_file")
+    args = parser.parse_args()
+    print(summary_report(args.metrics_file))
@@ -0,0 +1,115 @@
+import json
+import os
+import pickle
+import shutil
+import uuid
+from datetime import datetime
+
+# -------------------------------
+# Config
+# -------------------------------
+# model_bundles/<version>/{model.h5, scaler.pkl, meta.json} and a LATEST file
+# holding the current version id
+BUNDLE_DIR = "model_bundles"
+LATEST = "LATEST"
+MODEL_FILE = "model.h5"
+SCALER_FILE = "scaler.pkl"
+META_FILE = "meta.json"
+
+
+class ModelBundle:
+    """A saved model version: fitted scaler, feature order, metadata and (lazily) the Keras model."""
+
+    def __init__(self, path, scaler, feature_cols, metadata):
+        self.path = path
+        self.version = metadata["version"]
+        self.scaler = scaler
+        self.feature_cols = feature_cols
+        self.metadata = metadata
+        self._model = None
+
+    @property
+    def model(self):
+        # TensorFlow is only imported when the model is first needed
+        if self._model is None:
+            from tensorflow.keras.models import load_model
+            self._model = load_model(os.path.join(self.path, MODEL_FILE), compile=False)
+        return self._model
+
+    def transform(self, df):
+        # Scale a frame's feature columns, in training order
+        return self.scaler.transform(df[self.feature_cols].to_numpy(dtype="float32"))
+
+
+def new_version():
+    return datetime.now().strftime("%Y%m%d_%H%M%S") + "_" + uuid.uuid4().hex[:6]
+
+
+# -------------------------------
+# Saving
+# -------------------------------
+def save_bundle(model, scaler, feature_cols, metadata=None, root=BUNDLE_DIR):
+    """Write a new bundle version and point LATEST at it.
+
+    The bundle is written to a temporary folder and renamed into place, and LATEST
+    is replaced atomically, so readers never see a half-written version.
+    """
+    version = new_version()
+    metadata = dict(metadata or {})
+    metadata.update({
+        "version": version,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "feature_cols": list(feature_cols),
+    })
+
+    os.makedirs(root, exist_ok=True)
+    tmp_path = os.path.join(root, f".tmp-{version}")
+    os.makedirs(tmp_path)
+    try:
+        model.save(os.path.join(tmp_path, MODEL_FILE))
+        with open(os.path.join(tmp_path, SCALER_FILE), "wb") as f:
+            pickle.dump(scaler, f)
+        with open(os.path.join(tmp_path, META_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=1, default=str)
+        os.rename(tmp_path, os.path.join(root, version))
+    except Exception:
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        raise
+
+    latest_path = os.path.join(root, LATEST)
+    with open(latest_path + ".tmp", "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(latest_path + ".tmp", latest_path)
+    print(f"Saved model bundle {version} to {os.path.join(root, version)}")
+    return version
+
+
+# -------------------------------
+# Loading
+# -------------------------------
+def latest_version(root=BUNDLE_DIR):
+    latest_path = os.path.join(root, LATEST)
+    if not os.path.exists(latest_path):
+        return None
+    with open(latest_path, encoding="utf-8") as f:
+        return f.read().strip()
+
+
+def list_versions(root=BUNDLE_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name for name in os.listdir(root) if os.path.isfile(os.path.join(root, name, META_FILE)))
+
+
+def load_bundle(version=None, root=BUNDLE_DIR):
+    """Load a bundle version (default: LATEST). The Keras model loads on first use."""
+    version = version or latest_version(root)
+    if version is None:
+        raise FileNotFoundError(f"No model bundle found in {root}; run model_training.py first")
+
+    path = os.path.join(root, version)
+    with open(os.path.join(path, META_FILE), encoding="utf-8") as f:
+        metadata = json.load(f)
+    with open(os.path.join(path, SCALER_FILE), "rb") as f:
+        scaler = pickle.load(f)
+    return ModelBundle(path, scaler, metadata["feature_cols"], metadata)
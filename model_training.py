@@ -0,0 +1,524 @@
+import argparse
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    mean_absolute_error,
+    mean_absolute_percentage_error,
+    mean_squared_error,
+    precision_score,
+    r2_score,
+    recall_score,
+)
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+import display_artifact
+import feature_builder
+import feature_cache
+import instrumentation
+import model_bundle
+import scores_store
+import stats_store
+
+# The notebook's load / feature / train / score stages as plain functions.
+# TensorFlow is only imported by the functions that need it, so loading
+# features (e.g. from batch_inference.py) stays light.
+
+# -------------------------------
+# Config
+# -------------------------------
+INJURY_FILE = "ncaab_injury_dataframes_2025_2026.rds"
+CROSSWALK_FILE = "teamNamesSR.xlsx"
+PREDICTIONS_FILE = "NCAA_Basketball_Spread_Predictions_2025_2026.rds"
+CHECKPOINT_FILE = "best_model_joint.h5"
+
+RATING_COL = "predictive-by-other"
+TOP_N = 200
+
+# Game columns 0-7, then the targets, then the predictors
+TARGET_COLS = ["Underdog.Win", "Score.Diff", "Total.Pts"]
+FIRST_TARGET_COL = 8
+FIRST_FEATURE_COL = 11
+
+TEST_SIZE = 0.3        # share of games held out of training
+HOLDOUT_SIZE = 0.33    # share of the held-out games used for test, the rest is validation
+RANDOM_STATE = 5
+
+# "chronological" trains on the oldest games, validates on the next and tests on the
+# newest, so no game is scored by a model that saw later games and the test metrics
+# are what the next games will see. "random" shuffles games into the splits, as the
+# notebook did before; it is kept as an opt-in to reproduce those runs.
+SPLIT = "chronological"
+SPLITS = ("random", "chronological")
+
+EPOCHS = 500
+BATCH_SIZE = 32
+DROPOUT_RATE = 0.2
+L2_LAMBDA = 0.001
+
+# TensorFlow thread pools; 0 lets TensorFlow use every core
+INTRA_OP_THREADS = 0
+INTER_OP_THREADS = 0
+
+
+# -------------------------------
+# Load
+# -------------------------------
+def load_pickle(filename, default=None):
+    if not os.path.exists(filename):
+        return default
+    with open(filename, "rb") as f:
+        return pickle.load(f)
+
+
+def load_inputs():
+    """Scores with TeamRankings names, injuries keyed by date, and the reverse name map."""
+    df_crosswalk = pd.read_excel(CROSSWALK_FILE)
+    name_map = dict(zip(df_crosswalk["SportsReferenceName"], df_crosswalk["TeamRankingsName"]))
+    reverse_name_map = dict(zip(df_crosswalk["TeamRankingsName"], df_crosswalk["SportsReferenceName"]))
+
+    df_scores_TR = feature_builder.map_scores(scores_store.load_scores(), name_map)
+    injury_df_dict = feature_builder.map_injury_teams(load_pickle(INJURY_FILE, {}), name_map)
+    return df_scores_TR, injury_df_dict, reverse_name_map
+
+
+# -------------------------------
+# Features
+# -------------------------------
+def build_features(df_scores_TR, injury_df_dict, verbose=True):
+    """Game rows with stats, injuries and targets, limited to games involving a top-200 team.
+
+    Rows with a missing predictor are dropped; unplayed games are kept (their
+    targets are NaN) so they can be scored.
+    """
+    df_injury_counts = feature_builder.injury_counts(injury_df_dict)
+    df_master = feature_cache.build_features_cached(df_scores_TR, df_injury_counts, verbose=verbose)
+    df_master["Date.Game"] = pd.to_datetime(df_master["Date.Game"])
+
+    df_ratings = stats_store.load_stats("home", columns=[RATING_COL])
+    cutoff_values = feature_builder.rank_cutoffs(df_ratings, RATING_COL, top_n=TOP_N)
+    df_filtered = feature_builder.filter_top_ranked(df_master, cutoff_values, RATING_COL)
+    return df_filtered.dropna(subset=feature_columns(df_filtered))
+
+
+def load_features(verbose=False):
+    df_scores_TR, injury_df_dict, reverse_name_map = load_inputs()
+    return build_features(df_scores_TR, injury_df_dict, verbose), reverse_name_map
+
+
+def feature_columns(df_filtered):
+    return list(df_filtered.columns[FIRST_FEATURE_COL:])
+
+
+def training_frame(df_filtered):
+    # Played games only: float32 predictors plus the three targets
+    df_analyze = df_filtered[df_filtered.columns[FIRST_TARGET_COL:]].astype("float32")
+    df_analyze["Underdog.Win"] = df_filtered["Underdog.Win"].astype(int)
+    df_analyze["Score.Diff"] = df_filtered["Score.Diff"]
+    df_analyze["Total.Pts"] = df_filtered["Total.Pts"]
+    return df_analyze.dropna()
+
+
+def split_data(df_analyze, split=SPLIT, dates=None):
+    """Train/validation/test split with a scaler fitted on the training set only.
+
+    The default chronological split needs `dates`, the game date of every
+    row of df_analyze. Returns a dict of float32 arrays (X_*, y_spread_*, y_winner_*),
+    the fitted scaler and the feature column order.
+    """
+    if split not in SPLITS:
+        raise ValueError(f"split must be one of {SPLITS}, not {split!r}")
+    X = df_analyze.drop(TARGET_COLS, axis=1)
+    y_spread = df_analyze["Score.Diff"].astype(float).to_numpy()
+    y_winner = df_analyze["Underdog.Win"].astype(int).to_numpy().reshape(-1, 1)
+    X_all = X.to_numpy(dtype="float32")
+
+    if split == "random":
+        X_train, X_val, y_train_spread, y_val_spread, y_train_winner, y_val_winner = train_test_split(
+            X_all, y_spread, y_winner, test_size=TEST_SIZE, random_state=RANDOM_STATE
+        )
+        X_val, X_test, y_val_spread, y_test_spread, y_val_winner, y_test_winner = train_test_split(
+            X_val, y_val_spread, y_val_winner, test_size=HOLDOUT_SIZE, random_state=RANDOM_STATE
+        )
+    else:
+        if dates is None:
+            raise ValueError("a chronological split needs the game dates")
+        # Same shares as the random split, cut in date order (stable within a date)
+        order = np.argsort(pd.to_datetime(np.asarray(dates)), kind="stable")
+        n_held = int(np.ceil(len(order) * TEST_SIZE))
+        n_test = int(np.ceil(n_held * HOLDOUT_SIZE))
+        train_idx, val_idx, test_idx = np.split(order, [len(order) - n_held, len(order) - n_test])
+        X_train, X_val, X_test = X_all[train_idx], X_all[val_idx], X_all[test_idx]
+        y_train_spread, y_val_spread, y_test_spread = y_spread[train_idx], y_spread[val_idx], y_spread[test_idx]
+        y_train_winner, y_val_winner, y_test_winner = y_winner[train_idx], y_winner[val_idx], y_winner[test_idx]
+
+    transformer = StandardScaler()
+    data = {
+        "X_train": transformer.fit_transform(X_train),
+        "X_val": transformer.transform(X_val),
+        "X_test": transformer.transform(X_test),
+        "y_train_spread": y_train_spread, "y_val_spread": y_val_spread, "y_test_spread": y_test_spread,
+        "y_train_winner": y_train_winner, "y_val_winner": y_val_winner, "y_test_winner": y_test_winner,
+    }
+    return data, transformer, list(X.columns)
+
+
+# -------------------------------
+# Model
+# -------------------------------
+def f1_score_tf(y_true, y_pred):
+    import tensorflow
+
+    y_pred = tensorflow.round(tensorflow.clip_by_value(y_pred, 0, 1))
+    y_true = tensorflow.cast(y_true, tensorflow.float32)
+
+    tp = tensorflow.reduce_sum(tensorflow.cast(y_true * y_pred, tensorflow.float32))
+    fp = tensorflow.reduce_sum(tensorflow.cast((1 - y_true) * y_pred, tensorflow.float32))
+    fn = tensorflow.reduce_sum(tensorflow.cast(y_true * (1 - y_pred), tensorflow.float32))
+
+    precision = tensorflow.math.divide_no_nan(tp, tp + fp)
+    recall = tensorflow.math.divide_no_nan(tp, tp + fn)
+    return tensorflow.math.divide_no_nan(2 * precision * recall, precision + recall)
+
+
+def build_model(n_features, dropout_rate=DROPOUT_RATE, l2_lambda=L2_LAMBDA):
+    """Shared dense trunk with a winner (sigmoid) head and a spread (linear) head."""
+    import tensorflow
+    from tensorflow.keras.layers import BatchNormalization, Dense, Dropout, Input
+    from tensorflow.keras.models import Model
+    from tensorflow.keras.regularizers import l2
+
+    tensorflow.keras.backend.clear_session()
+
+    inputs = Input(shape=(n_features,))
+
+    # Shared hidden layers
+    x = Dense(256, activation="relu", kernel_initializer="he_normal", kernel_regularizer=l2(l2_lambda))(inputs)
+    x = BatchNormalization()(x)
+    x = Dropout(dropout_rate)(x)
+
+    x = Dense(128, activation="relu", kernel_initializer="he_normal", kernel_regularizer=l2(l2_lambda))(x)
+    x = BatchNormalization()(x)
+    x = Dropout(dropout_rate)(x)
+
+    x = Dense(64, activation="relu", kernel_regularizer=l2(l2_lambda))(x)
+    x = BatchNormalization()(x)
+
+    winner_output = Dense(1, activation="sigmoid", name="winner")(x)
+    spread_output = Dense(1, activation="linear", name="spread")(x)
+
+    model = Model(inputs=inputs, outputs=[winner_output, spread_output])
+    model.compile(
+        optimizer="adam",
+        loss={"winner": "binary_crossentropy", "spread": "mse"},
+        metrics={
+            "winner": [
+                "accuracy",
+                tensorflow.keras.metrics.AUC(name="auc"),
+                f1_score_tf,
+                tensorflow.keras.metrics.Precision(name="precision"),
+                tensorflow.keras.metrics.Recall(name="recall")
+            ],
+            "spread": [
+                tensorflow.keras.metrics.MeanAbsoluteError(name="mae"),
+                tensorflow.keras.metrics.MeanSquaredError(name="mse")
+            ]
+        }
+    )
+    return model
+
+
+def balanced_checkpoint(filepath):
+    """Keras callback saving the model whenever 0.67 * (1 - RMSE/40) + 0.33 * precision improves."""
+    from tensorflow.keras.callbacks import Callback
+
+    class BalancedCheckpoint(Callback):
+        def __init__(self, filepath):
+            super().__init__()
+            self.filepath = filepath
+            self.best_score = -np.inf
+
+        def on_epoch_end(self, epoch, logs=None):
+            logs = logs or {}
+            class_metric = logs.get("val_winner_precision")
+            reg_metric = logs.get("val_spread_mse")
+            if class_metric is None or reg_metric is None:
+                return
+
+            # Normalize RMSE by dividing by 40 (approx typical spread range)
+            rmse = np.sqrt(reg_metric)
+            combined_score = (1 - rmse / 40.0) * 0.67 + class_metric * 0.33
+            if combined_score > self.best_score:
+                self.best_score = combined_score
+                self.model.save(self.filepath)
+                print(
+                    f"\nEpoch {epoch+1}: "
+                    f"New best weighted score {combined_score:.4f} "
+                    f"(class={class_metric:.4f}, rmse={rmse:.4f}), model saved."
+                )
+
+    return BalancedCheckpoint(filepath)
+
+
+def epoch_timer():
+    """Keras callback keeping the wall time of every epoch in `.seconds`."""
+    from tensorflow.keras.callbacks import Callback
+
+    class EpochTimer(Callback):
+        def __init__(self):
+            super().__init__()
+            self.seconds = []
+
+        def on_epoch_begin(self, epoch, logs=None):
+            self._start = time.perf_counter()
+
+        def on_epoch_end(self, epoch, logs=None):
+            self.seconds.append(time.perf_counter() - self._start)
+
+    return EpochTimer()
+
+
+# -------------------------------
+# Input pipeline
+# -------------------------------
+def configure_threads(intra_op=INTRA_OP_THREADS, inter_op=INTER_OP_THREADS):
+    # Only takes effect before TensorFlow's runtime starts (the first op in the process)
+    import tensorflow
+
+    threading = tensorflow.config.threading
+    if (threading.get_intra_op_parallelism_threads(), threading.get_inter_op_parallelism_threads()) == (intra_op, inter_op):
+        return
+    try:
+        tensorflow.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tensorflow.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError as e:
+        print(f"Keeping TensorFlow's thread settings: {e}")
+
+
+def make_dataset(X, y_winner, y_spread, batch_size=BATCH_SIZE, shuffle=False, seed=RANDOM_STATE):
+    """Batched tf.data pipeline over in-memory float32 arrays: cache, (re)shuffle, batch, prefetch.
+
+    Rows are cached once as tensors, so later epochs do no Python-side conversion,
+    and the next batch is prepared while the current one trains.
+    """
+    import tensorflow
+
+    dataset = tensorflow.data.Dataset.from_tensor_slices((
+        X.astype("float32"),
+        {"winner": y_winner.astype("float32"), "spread": y_spread.astype("float32").reshape(-1, 1)},
+    )).cache()
+    if shuffle:
+        dataset = dataset.shuffle(len(X), seed=seed, reshuffle_each_iteration=True)
+    return dataset.batch(batch_size).prefetch(tensorflow.data.AUTOTUNE)
+
+
+# -------------------------------
+# Train
+# -------------------------------
+def train(data, epochs=EPOCHS, batch_size=BATCH_SIZE, checkpoint_file=CHECKPOINT_FILE, verbose=1,
+          use_dataset=True, intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS):
+    """Fit a fresh model and reload its best checkpoint. Returns (best_model, model, history, seconds).
+
+    Inputs come from tf.data pipelines (`use_dataset=False` feeds the arrays to
+    fit() directly, as before). Per-epoch wall times are in `history.epoch_seconds`.
+    """
+    from tensorflow.keras.models import load_model
+
+    configure_threads(intra_op_threads, inter_op_threads)
+    model = build_model(data["X_train"].shape[1])
+    timer = epoch_timer()
+    callbacks = [timer, balanced_checkpoint(checkpoint_file)]
+
+    start = time.time()
+    if use_dataset:
+        history = model.fit(
+            make_dataset(data["X_train"], data["y_train_winner"], data["y_train_spread"], batch_size, shuffle=True),
+            validation_data=make_dataset(data["X_val"], data["y_val_winner"], data["y_val_spread"], batch_size),
+            epochs=epochs,
+            shuffle=False,  # the training dataset reshuffles itself every epoch
+            callbacks=callbacks,
+            verbose=verbose,
+        )
+    else:
+        history = model.fit(
+            data["X_train"],
+            {"winner": data["y_train_winner"], "spread": data["y_train_spread"]},
+            validation_data=(data["X_val"], {"winner": data["y_val_winner"], "spread": data["y_val_spread"]}),
+            epochs=epochs,
+            batch_size=batch_size,
+            callbacks=callbacks,
+            verbose=verbose,
+        )
+    seconds = time.time() - start
+    history.epoch_seconds = timer.seconds
+    best_model = load_model(checkpoint_file, compile=False)
+    return best_model, model, history, seconds
+
+
+# -------------------------------
+# Evaluate
+# -------------------------------
+def adj_r2_score(predictors, targets, predictions):
+    r2 = r2_score(targets, predictions)
+    n, k = predictors.shape
+    return 1 - ((1 - r2) * (n - 1) / (n - k - 1))
+
+
+def model_performance_regression(model, predictors, target):
+    pred = model.predict(predictors, verbose=0)[1]
+    return pd.DataFrame({
+        "RMSE": np.sqrt(mean_squared_error(target, pred)),
+        "MAE": mean_absolute_error(target, pred),
+        "R-squared": r2_score(target, pred),
+        "Adj. R-squared": adj_r2_score(predictors, target, pred),
+        "MAPE": mean_absolute_percentage_error(target, pred),
+    }, index=[0])
+
+
+def model_performance_classification(model, predictors, target, threshold=0.5):
+    pred = model.predict(predictors, verbose=0)[0] > threshold
+    return pd.DataFrame({
+        "Accuracy": accuracy_score(target, pred),
+        "Recall": recall_score(target, pred, average="binary"),
+        "Precision": precision_score(target, pred, average="binary"),
+        "F1 Score": f1_score(target, pred, average="binary"),
+    }, index=[0])
+
+
+def evaluate(model, data):
+    """{"regression": {split: frame}, "classification": {split: frame}} for train, val and test."""
+    results = {"regression": {}, "classification": {}}
+    for split in ("train", "val", "test"):
+        X = data[f"X_{split}"]
+        results["regression"][split] = model_performance_regression(model, X, data[f"y_{split}_spread"])
+        results["classification"][split] = model_performance_classification(model, X, data[f"y_{split}_winner"])
+    return results
+
+
+def bundle_metadata(df_filtered, data, performance, epochs, batch_size, split, training_seconds):
+    """Training metadata stored with a model bundle (run() and the notebook both save bundles)."""
+    return {
+        "games_through": str(df_filtered.dropna(subset=["Score.Diff"])["Date.Game"].max().date()),
+        "n_train": len(data["X_train"]),
+        "n_val": len(data["X_val"]),
+        "n_test": len(data["X_test"]),
+        "epochs": epochs,
+        "batch_size": batch_size,
+        "split": split,
+        "training_seconds": round(training_seconds, 1),
+        "test_regression": performance["regression"]["test"].iloc[0].to_dict(),
+        "test_classification": performance["classification"]["test"].iloc[0].to_dict(),
+    }
+
+
+# -------------------------------
+# Score
+# -------------------------------
+def format_predictions(df, spread_pred, winner_prob, reverse_name_map):
+    # Targets next to their predictions (columns 6-9) and Sports Reference team names
+    df = df.copy()
+    df["Predicted.Score.Diff"] = spread_pred
+    cols = df.columns.tolist()
+    cols.insert(6, cols.pop(cols.index("Score.Diff")))
+    cols.insert(7, cols.pop(cols.index("Predicted.Score.Diff")))
+    df = df[cols]
+
+    df["Predicted.Underdog.Win.Prob"] = winner_prob
+    cols = df.columns.tolist()
+    cols.insert(6, cols.pop(cols.index("Underdog.Win")))
+    cols.insert(7, cols.pop(cols.index("Predicted.Underdog.Win.Prob")))
+    df = df[cols]
+
+    for col in ["Home", "Away", "Favorite", "Underdog"]:
+        df[col] = df[col].map(reverse_name_map)
+    return df
+
+
+def score(df_filtered, model, transformer, feature_cols, reverse_name_map, batch_size=1024):
+    X = transformer.transform(df_filtered[feature_cols].to_numpy(dtype="float32"))
+    winner_prob, spread_pred = model.predict(X, batch_size=batch_size, verbose=0)
+    return format_predictions(df_filtered, spread_pred.ravel(), winner_prob.ravel(), reverse_name_map)
+
+
+def save_predictions(df, filename=PREDICTIONS_FILE, display_file=display_artifact.DISPLAY_FILE):
+    with open(filename + ".tmp", "wb") as f:
+        pickle.dump(df, f)
+    os.replace(filename + ".tmp", filename)
+    # The Shiny app loads the compact display artifact built from the same frame
+    display_artifact.save_display(df, display_file)
+
+
+# -------------------------------
+# Run
+# -------------------------------
+def run(epochs=EPOCHS, batch_size=BATCH_SIZE, save_bundle=True, verbose=True, split=SPLIT,
+        intra_op_threads=INTRA_OP_THREADS, inter_op_threads=INTER_OP_THREADS):
+    """Load, build features, train, evaluate, score every game and save the predictions.
+
+    Returns a dict with every intermediate the notebook displays.
+    """
+    start = time.time()
+    with instrumentation.stage("training_features"):
+        df_filtered, reverse_name_map = load_features(verbose)
+        df_analyze = training_frame(df_filtered)
+        data, transformer, feature_cols = split_data(df_analyze, split, df_filtered.loc[df_analyze.index, "Date.Game"])
+    instrumentation.record_rows("training_games", len(df_analyze))
+    print(f"Training on {len(data['X_train'])} games, validating on {len(data['X_val'])}, testing on {len(data['X_test'])}")
+
+    with instrumentation.stage("training_fit"):
+        best_model, model, history, training_seconds = train(data, epochs, batch_size, verbose=1 if verbose else 2,
+                                                             intra_op_threads=intra_op_threads, inter_op_threads=inter_op_threads)
+    with instrumentation.stage("training_evaluate"):
+        performance = evaluate(best_model, data)
+    print("Test regression:", performance["regression"]["test"].iloc[0].round(4).to_dict())
+    print("Test classification:", performance["classification"]["test"].iloc[0].round(4).to_dict())
+
+    bundle_version = None
+    if save_bundle:
+        bundle_version = model_bundle.save_bundle(
+            best_model,
+            transformer,
+            feature_cols,
+            metadata=bundle_metadata(df_filtered, data, performance, epochs, batch_size, split, training_seconds),
+        )
+
+    with instrumentation.stage("training_score"):
+        df_predictions = score(df_filtered, best_model, transformer, feature_cols, reverse_name_map)
+        save_predictions(df_predictions)
+    instrumentation.record_rows("games_scored", len(df_predictions))
+    print(f"Saved {len(df_predictions)} predictions to {PREDICTIONS_FILE} in {time.time() - start:.1f}s")
+
+    return {
+        "df_filtered": df_filtered,
+        "df_analyze": df_analyze,
+        "data": data,
+        "transformer": transformer,
+        "feature_cols": feature_cols,
+        "model": model,
+        "best_model": best_model,
+        "history": history,
+        "training_seconds": training_seconds,
+        "performance": performance,
+        "bundle_version": bundle_version,
+        "df_predictions": df_predictions,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train the joint spread/winner model and score every game.")
+    parser.add_argument("--epochs", type=int, default=EPOCHS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--no-bundle", action="store_true", help="do not save a new model bundle version")
+    parser.add_argument("--quiet", action="store_true", help="one line per epoch and no feature build messages")
+    parser.add_argument("--split", choices=SPLITS, default=SPLIT)
+    parser.add_argument("--intra-op-threads", type=int, default=INTRA_OP_THREADS, help="threads within an op (0 = all cores)")
+    parser.add_argument("--inter-op-threads", type=int, default=INTER_OP_THREADS, help="ops run in parallel (0 = TensorFlow's choice)")
+    args = parser.parse_args()
+    run(epochs=args.epochs, batch_size=args.batch_size, save_bundle=not args.no_bundle, verbose=not args.quiet,
+        split=args.split, intra_op_threads=args.intra_op_threads, inter_op_threads=args.inter_op_threads)
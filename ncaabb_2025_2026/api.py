@@ -0,0 +1,204 @@
+import hashlib
+import json
+from datetime import date
+from urllib.parse import urlencode
+
+import numpy as np
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+# -------------------------------
+# Config
+# -------------------------------
+# Read-only JSON API over the same display artifact as the dashboard, mounted at /api:
+#   GET /api/version
+#   GET /api/predictions?date=YYYY-MM-DD&date=...&start=&end=&team=&band=low|medium|high&played=true|false&page=1&page_size=50
+#   GET /api/predictions/today
+#   GET /api/metrics?start=&end=   (metrics are null for a window with no played games)
+#   GET /api/metrics/trend          (season-to-date metrics after every game date)
+# Responses carry an ETag of (artifact version, query), so unchanged data answers 304.
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+CACHE_CONTROL = "public, max-age=60"
+
+# Win.Probability bands, as the dashboard's confidence circles
+BANDS = {"low": (0.5, 0.67), "medium": (0.67, 0.95), "high": (0.95, 1.0)}
+
+API_COLS = [
+    "Date.Game", "Home", "Away", "Predicted.Winner", "Predicted.Winner.Ranking.Position", "Opponent",
+    "Predicted.Score.Diff", "Win.Probability", "Actual.Winner", "Actual.Score.Diff", "Model.Pick", "Played",
+]
+
+
+class BadRequest(ValueError):
+    pass
+
+
+# -------------------------------
+# Queries
+# -------------------------------
+def parse_date(value, name):
+    # Dates are compared as 'YYYY-MM-DD' strings, so anything else must be rejected
+    try:
+        return date.fromisoformat(value.strip()).isoformat()
+    except ValueError:
+        raise BadRequest(f"{name} must be a date (YYYY-MM-DD)")
+
+
+def date_window(params):
+    """(start, end) dates of a start/end filter; either may be None (open)."""
+    start, end = [parse_date(params[name], name) if params.get(name) else None for name in ("start", "end")]
+    if start and end and start > end:
+        raise BadRequest("start must not be after end")
+    return start, end
+
+
+def parse_query(params):
+    """Canonical query (sorted, validated) from request parameters."""
+    query = {}
+    dates = sorted({parse_date(value, "date") for value in params.getlist("date")})
+    if dates:
+        query["date"] = dates
+    start, end = date_window(params)
+    if start:
+        query["start"] = start
+    if end:
+        query["end"] = end
+    if params.get("team"):
+        query["team"] = params["team"].strip()
+    if params.get("band"):
+        if params["band"] not in BANDS:
+            raise BadRequest(f"band must be one of {sorted(BANDS)}")
+        query["band"] = params["band"]
+    if params.get("played"):
+        if params["played"] not in ("true", "false"):
+            raise BadRequest("played must be true or false")
+        query["played"] = params["played"]
+    try:
+        query["page"] = max(1, int(params.get("page", 1)))
+        query["page_size"] = min(MAX_PAGE_SIZE, max(1, int(params.get("page_size", PAGE_SIZE))))
+    except ValueError:
+        raise BadRequest("page and page_size must be integers")
+    return query
+
+
+def select_games(data, query):
+    # An explicit date list narrows the frame first; the rest are column masks on what remains
+    if "date" in query:
+        df = data.master_slice(query["date"])
+    else:
+        df = data.df_master
+    if "start" in query:
+        df = df[df["Date.Game"] >= query["start"]]
+    if "end" in query:
+        df = df[df["Date.Game"] <= query["end"]]
+    if "team" in query:
+        team = query["team"].lower()
+        df = df[(df["Home"].str.lower() == team) | (df["Away"].str.lower() == team)]
+    if "band" in query:
+        low, high = BANDS[query["band"]]
+        prob = df["Win.Probability"].to_numpy()
+        df = df[(prob >= low) & ((prob < high) if high < 1 else (prob <= high))]
+    if "played" in query:
+        df = df[df["Played"] == (query["played"] == "true")]
+    return df
+
+
+def predictions_body(data, query):
+    df = select_games(data, query)
+    page, page_size = query["page"], query["page_size"]
+    df_page = df.iloc[(page - 1) * page_size: page * page_size][API_COLS]
+    meta = json.dumps({"version": data.version, "page": page, "page_size": page_size, "total": len(df)})
+    # Records are serialized by pandas (NaN -> null) and spliced into the envelope
+    return meta[:-1] + ', "games": ' + df_page.to_json(orient="records") + "}"
+
+
+def trend_body(data):
+    meta = json.dumps({"version": data.version})
+    return meta[:-1] + ', "trend": ' + data.metric_trend().to_json(orient="records") + "}"
+
+
+def etag(version, query):
+    digest = hashlib.sha1(urlencode(sorted(query.items()), doseq=True).encode("utf-8")).hexdigest()[:12]
+    return f'W/"{version}-{digest}"'
+
+
+def json_response(request, body, tag):
+    headers = {"ETag": tag, "Cache-Control": CACHE_CONTROL}
+    if tag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def error_response(message, status=400):
+    return Response(json.dumps({"error": message}), status_code=status, media_type="application/json")
+
+
+# -------------------------------
+# App
+# -------------------------------
+def make_api(get_data, cached, today):
+    """Starlette app over `get_data()` (the current DisplayData), caching bodies with `cached(key, build)`."""
+
+    def today_query():
+        return {"date": [today()], "page": 1, "page_size": MAX_PAGE_SIZE}
+
+    def warm(data):
+        # Precompute today's slate for a freshly loaded artifact
+        query = today_query()
+        cached(("api", data.version, etag(data.version, query)), lambda: predictions_body(data, query))
+
+    def version(request):
+        data = get_data()
+        body = json.dumps({"version": data.version, "created": data.created, "games": len(data.df_master)})
+        return json_response(request, body, f'W/"{data.version}"')
+
+    def predictions(request):
+        data = get_data()
+        try:
+            query = parse_query(request.query_params)
+        except BadRequest as e:
+            return error_response(str(e))
+        tag = etag(data.version, query)
+        body = cached(("api", data.version, tag), lambda: predictions_body(data, query))
+        return json_response(request, body, tag)
+
+    def predictions_today(request):
+        data = get_data()
+        query = today_query()
+        tag = etag(data.version, query)
+        body = cached(("api", data.version, tag), lambda: predictions_body(data, query))
+        return json_response(request, body, tag)
+
+    def metrics(request):
+        data = get_data()
+        try:
+            start, end = date_window(request.query_params)
+        except BadRequest as e:
+            return error_response(str(e))
+        window = data.window_metrics(start, end)
+        if window["games"] == 0:
+            # No played games in the window: every metric is undefined
+            window = {name: (0 if name == "games" else None) for name in window}
+        else:
+            # A ratio with an empty denominator (e.g. precision with no predicted upsets) is undefined too
+            window = {name: (None if np.isnan(value) else value) for name, value in window.items()}
+        body = json.dumps({"version": data.version, "start": start, "end": end, **window})
+        return json_response(request, body, etag(data.version, {"metrics": 1, "start": start or "", "end": end or ""}))
+
+    def metrics_trend(request):
+        data = get_data()
+        tag = etag(data.version, {"trend": 1})
+        body = cached(("api", data.version, tag), lambda: trend_body(data))
+        return json_response(request, body, tag)
+
+    api = Starlette(routes=[
+        Route("/version", version),
+        Route("/predictions", predictions),
+        Route("/predictions/today", predictions_today),
+        Route("/metrics", metrics),
+        Route("/metrics/trend", metrics_trend),
+    ])
+    api.state.warm = warm
+    return api
@@ -1,113 +1,331 @@
 import pytz
-from shiny import App, ui, render
+from shiny import App, ui, render, reactive
 import pandas as pd
-import plotly.express as px
 import pickle
 import datetime
 from datetime import datetime, date, timedelta
 import numpy as np
-from sklearn.metrics import (
-    mean_squared_error,
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score
-)
-from shinywidgets import output_widget, render_widget  
-
-# Load data file NCAA_Basketball_Spread_Predictions_2025_2026.rds
-with open("NCAA_Basketball_Spread_Predictions_2025_2026.rds", "rb") as f:
-    df_predictions = pickle.load(f)
-
-# Prepare data
-df_master = df_predictions.copy()
-
-# Determine predicted winner
-df_master["Predicted.Winner"] = df_master.apply(
-    lambda row: row["Favorite"] if row["Predicted.Underdog.Win.Prob"] < 0.5 else row["Underdog"], axis=1)
+import os
+import threading
+import time
+from collections import OrderedDict
+from importlib.util import find_spec
+from starlette.applications import Starlette
+from starlette.responses import FileResponse
+from starlette.routing import Mount, Route
+
+from api import make_api
+
+# Startup budget: plotly.express is imported on the first figure build, and figures
+# are rendered as Plotly HTML (plotly.js served once from the plotly package) rather
+# than through shinywidgets/ipywidgets. benchmarks/bench_app_startup.py checks it.
+PLOTLY_JS = os.path.join(os.path.dirname(find_spec("plotly").origin), "package_data", "plotly.min.js")
+
+# Display artifact written by the scoring stage (display_artifact.py): one row per
+# game with the derived columns already computed. It is watched while the app runs,
+# so replacing the file (atomically) publishes new predictions without a redeploy.
+DISPLAY_FILE = os.environ.get("NCAAB_DISPLAY_FILE", "NCAA_Basketball_Display_2025_2026.rds")
+RELOAD_SECONDS = 30
+
+# Artifact layout this app reads (display_artifact.SCHEMA)
+SCHEMA = 2
+
+
+def load_artifact(path=DISPLAY_FILE):
+    with open(path, "rb") as f:
+        artifact = pickle.load(f)
+    if artifact.get("schema") != SCHEMA:
+        raise ValueError(f"{path} has schema {artifact.get('schema')}, expected {SCHEMA}")
+    return artifact
+
+
+# Running-total columns of the artifact's metrics ledger (display_artifact.metrics_ledger)
+LEDGER_SUMS = ["games", "sq_err", "abs_err", "tp", "fp", "fn", "tn"]
+
+
+def ratio(num, den):
+    # NaN where the denominator is 0: a window with no played games has no score, not a perfect one
+    num, den = np.asarray(num, dtype="float64"), np.asarray(den, dtype="float64")
+    return np.divide(num, den, out=np.full_like(num, np.nan), where=den > 0)
+
+
+def metrics_from_sums(sums):
+    """Metrics from ledger sums: one row per window (or a single window as a 1-D array)."""
+    games, sq_err, abs_err, tp, fp, fn, tn = np.moveaxis(np.asarray(sums, dtype="float64"), -1, 0)
+    return {
+        "games": games,
+        "rmse.spread": np.sqrt(ratio(sq_err, games)),
+        "mae.spread": ratio(abs_err, games),
+        "accuracy.moneyline": ratio(tp + tn, games),
+        "recall.moneyline": ratio(tp, tp + fn),
+        "precision.moneyline": ratio(tp, tp + fp),
+        "f1.moneyline": ratio(2 * tp, 2 * tp + fp + fn),
+    }
+
+
+class DisplayData:
+    """One artifact version, sliced once for every session: played games, metrics and per-date plot slices."""
+
+    def __init__(self, artifact):
+        self.version = artifact["version"]
+        self.created = artifact.get("created")
+        df_master = artifact["games"]
+
+        # Subset df_master for played games
+        self.df_played = df_master[df_master["Played"]]
+
+        # Metrics ledger: running totals with a leading zero row, so any window is cum[hi] - cum[lo]
+        ledger = artifact["ledger"]
+        self.ledger_dates = ledger["Date.Game"].to_numpy()
+        cum = ledger[[f"cum.{col}" for col in LEDGER_SUMS]].to_numpy(dtype="float64")
+        self.ledger_cum = np.vstack([np.zeros((1, len(LEDGER_SUMS))), cum])
+
+        # Create metrics dataframe (season to date)
+        self.df_metrics = pd.DataFrame([self.window_metrics()])
+        # Before the first played game there is no spread error; the plots draw no bands
+        self.rmse = np.nan_to_num(self.df_metrics["rmse.spread"].item())
+
+        # Exclude records where the predicted winner is not consistent with the predicted score difference
+        # For example, if the predicted winner is the home team but the predicted score difference is negative (indicating the away team is favored)
+        self.df_master = df_master[df_master["Models.Agree"]]
+
+        # Plot frames use the absolute predicted point differential; upcoming games are sliced by date once
+        df_plot = self.df_master.assign(**{"Predicted.Score.Diff": self.df_master["Predicted.Score.Diff"].abs()})
+        self.plot_by_date = dict(tuple(df_plot.groupby("Date.Game", sort=True)))
+        self.df_plot_empty = df_plot.iloc[:0]
+        self.df_past = df_plot[df_plot["Played"]]
+
+    def window_metrics(self, start=None, end=None):
+        """Metrics over played games dated start..end (inclusive, 'YYYY-MM-DD'; None = open)."""
+        lo = 0 if start is None else np.searchsorted(self.ledger_dates, start, side="left")
+        hi = len(self.ledger_dates) if end is None else np.searchsorted(self.ledger_dates, end, side="right")
+        window = {name: value.item() for name, value in metrics_from_sums(self.ledger_cum[hi] - self.ledger_cum[lo]).items()}
+        window["games"] = int(window["games"])
+        return window
+
+    def metric_trend(self):
+        # Season-to-date metrics after every game date (served at /api/metrics/trend)
+        df_trend = pd.DataFrame(metrics_from_sums(self.ledger_cum[1:]))
+        df_trend["games"] = df_trend["games"].astype("int64")
+        df_trend.insert(0, "Date.Game", self.ledger_dates)
+        return df_trend
+
+    def upcoming_dates(self, today):
+        return [d for d in self.plot_by_date if d >= today]
+
+    def plot_slice(self, dates):
+        frames = [self.plot_by_date[d] for d in dates if d in self.plot_by_date]
+        return pd.concat(frames) if frames else self.df_plot_empty
+
+    def master_slice(self, dates):
+        return self.df_master[self.df_master["Date.Game"].isin(dates)]
+
+
+def file_signature(path):
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+_signature = file_signature(DISPLAY_FILE)
+data = DisplayData(load_artifact())
+
+# Built figures (as Plotly HTML) and table frames, shared by every session.
+# Keys hold the artifact version, so a new artifact never serves stale payloads.
+CACHE_SIZE = 256
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def cached(key, build):
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    value = build()
+    with _cache_lock:
+        _cache[key] = value
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return value
+
+
+def watch_artifact(path=DISPLAY_FILE, interval=RELOAD_SECONDS):
+    """Background thread: load a replaced artifact off the event loop, then swap it in."""
+    global data, _signature
+    failed = None
+    while True:
+        time.sleep(interval)
+        signature = None
+        try:
+            signature = file_signature(path)
+            if signature == _signature:
+                continue
+            new_data = DisplayData(load_artifact(path))
+        except Exception as e:
+            # Retried every interval (the file may still be mid-copy); reported once per file state
+            if signature != failed:
+                print(f"Keeping artifact {data.version}; reload failed: {e!r}")
+                failed = signature
+            continue
+        # Marked as seen only once it has loaded
+        _signature = signature
+        if new_data.version == data.version:
+            continue
+        # One reference assignment: a render sees the old or the new version, never a mix
+        old_version, data = data.version, new_data
+        with _cache_lock:
+            _cache.clear()
+        api.state.warm(new_data)
+        print(f"Loaded artifact {new_data.version} (was {old_version})")
+
+
+# Shared by every session: invalidates dependent outputs when the version changes
+@reactive.poll(lambda: data.version, interval_secs=5)
+def current_data():
+    return data
+
+
+def central_today():
+    return datetime.now(pytz.timezone('US/Central')).strftime('%Y-%m-%d')
 
-# Determine predicted winner ranking position based on predicted win probability
-df_master["Predicted.Winner.Ranking.Position"] = df_master.apply(
-    lambda row: "Favorite" if row["Predicted.Underdog.Win.Prob"] < 0.5 else "Underdog", axis=1)
 
-# Determine actual winner
-df_master["Actual.Winner"] = df_master.apply(
-    lambda row: row["Home"] if row["Score.Diff"] > 0 else row["Away"], axis=1)
+# Set today's date as it currently stands in central time zone
+today_central = central_today()
 
-# Find Probability of predicted winner
-df_master["Win.Probability"] = df_master.apply(
-    lambda row: row["Predicted.Underdog.Win.Prob"] if row["Predicted.Winner"] == row["Underdog"]
-    else 1 - row["Predicted.Underdog.Win.Prob"], axis=1)
 
-# Apply a power transformation to Win.Probability to accentuate differences
-p = 2.5   # try 1.5, 2, 3 depending on how strong you want the effect
+def format_metric(value, scale, suffix):
+    # Metrics of a window with no played games are NaN
+    return "n/a" if np.isnan(value) else f"{round(scale * value, 1)}{suffix}"
 
-# Original probabilities
-x = df_master['Win.Probability']
 
-# Step 1: map [0.5, 1] → [0, 1]
-z = 2 * (x - 0.5)
+TABLE_STYLES = {"searching": True, "ordering": True, "pageLength": 10, "filters": True}
+DATE_TABLE_COLS = ["Date.Game","Home","Away","Predicted.Winner","Predicted.Winner.Ranking.Position","Predicted.Score.Diff","Win.Probability"]
+PAST_TABLE_COLS = ["Date.Game","Home","Away","Predicted.Winner","Actual.Winner","Predicted.Score.Diff","Actual.Score.Diff"]
 
-# Step 2: apply power transform
-z_prime = z ** p
+prob_thresholds = [0.67, 0.95, 1]
+colors = [
+    "rgba(200,0,0,0.3)",    # red (low confidence)
+    "rgba(200,200,0,0.3)",  # yellow (medium confidence)
+    "rgba(0,200,0,0.3)"     # green (high confidence)
+]
 
-# Step 3: map back to [0.5, 1]
-df_master['Win.Probability'] = 0.5 + 0.5 * z_prime
 
-#Round Probability
-df_master['Win.Probability'] = round(df_master['Win.Probability'],3)
+def figure_html(fig):
+    return fig.to_html(full_html=False, include_plotlyjs=False, default_height="450px", config={"responsive": True})
 
-#If Probability  is 1, set to 0.999
-df_master['Win.Probability'] = df_master['Win.Probability'].apply(lambda x: 0.999 if x == 1 else x)
 
-# Round Score.Diff
-df_master['Predicted.Score.Diff'] = (df_master['Predicted.Score.Diff'] * 2).round() / 2
+def build_daily_figure(df_filtered, rmse):
+    import plotly.express as px
 
-# Convert to datetime and back to string without time
-df_master['Date.Game'] = pd.to_datetime(df_master['Date.Game']).dt.strftime('%Y-%m-%d')
+    # Build daily plot
+    fig_date = px.scatter(
+        df_filtered,
+        x="Predicted.Score.Diff",
+        y="Win.Probability",
+        color="Predicted.Winner.Ranking.Position",
+        opacity=0.7,
+        hover_data=["Date.Game","Predicted.Winner","Opponent","Predicted.Score.Diff","Win.Probability"]
+    )
 
-# Subset df_master for played games
-df_played = df_master.dropna(subset=["Home.Points", "Away.Points"])
+    fig_date.update_traces(marker=dict(size=6, opacity=0.7))
 
-# Create metrics dataframe
-rmse = np.sqrt(mean_squared_error(df_played['Score.Diff'],df_played['Predicted.Score.Diff']))
-mae = (df_played['Score.Diff'] - df_played['Predicted.Score.Diff']).abs().mean()
-accuracy = accuracy_score(df_played['Underdog.Win'], df_played['Predicted.Underdog.Win.Prob'] > 0.5)
-recall = recall_score(df_played['Underdog.Win'], df_played['Predicted.Underdog.Win.Prob'] > 0.5)
-precision = precision_score(df_played['Underdog.Win'], df_played['Predicted.Underdog.Win.Prob'] > 0.5)
-f1 = f1_score(df_played['Underdog.Win'], df_played['Predicted.Underdog.Win.Prob'] > 0.5)
+    fig_date.add_annotation(
+        text="MOST PROBABLE",
+        x=rmse + 15,
+        y=0.925,
+        showarrow=False,
+        font=dict(color="red")
+    )
 
-df_metrics = {
-    "rmse.spread": rmse,
-    "mae.spread": mae,
-    "accuracy.moneyline": accuracy,
-    "recall.moneyline": recall,
-    "precision.moneyline": precision,
-    "f1.moneyline": f1
-}
+    fig_date.add_annotation(
+        text="WINNERS",
+        x=rmse + 15,
+        y=0.9,
+        showarrow=False,
+        font=dict(color="red")
+    )
 
-df_metrics = pd.DataFrame([df_metrics])
+    # Add circular bands for each probability range
+    for i, color in enumerate(colors):
+        fig_date.add_shape(
+            type="circle",
+            xref="x", yref="y",
+            x0=-(i+1) * rmse,
+            y0= 0.5 - (prob_thresholds[i] - 0.5),       # lower bound of probability band
+            x1=(i+1) * rmse,
+            y1=prob_thresholds[i],     # upper bound of probability band
+            fillcolor=color,
+            opacity=0.4,
+            line_width=0,
+            layer="below"
+        )
 
-# Rename Score.Diff for display in the app
-df_master = df_master.rename(columns={"Score.Diff": "Actual.Score.Diff"})
+    fig_date.update_layout(
+        title="Predicted Winners with Circular Error Bands",
+        xaxis_title="Predicted Point Differential",
+        yaxis_title="Predicted Win Probability",
+        xaxis_range=[0, 40],
+        yaxis_range=[0.5, 1.1]
+        )
+    fig_date.update_layout(legend=dict(font=dict(size=9)))
+    legend_title = "Predicted.Winner. Ranking.Position"
+    wrapped_title = "<br>".join(legend_title.split(" "))
+    fig_date.update_layout(legend=dict(title=dict(text=wrapped_title)))
+    return fig_date
+
+
+def build_past_figure(df_past, rmse):
+    import plotly.express as px
+
+    # Create a past results plot
+    fig_all = px.scatter(
+        df_past, 
+        x="Predicted.Score.Diff", 
+        y="Win.Probability", 
+        color="Model.Pick", 
+        opacity=0.5, 
+        hover_data=["Date.Game",
+                    "Predicted.Winner",
+                    "Opponent",
+                    "Win.Probability",
+                    "Predicted.Score.Diff",
+                    "Model.Pick"]
+    )
 
-# Exclude records from df_plot where the predicted winner is not consistent with the predicted score difference
-# For example, if the predicted winner is the home team but the predicted score difference is negative (indicating the away team is favored), remove that record
-df_master = df_master[~(
-    ((df_master["Predicted.Winner"] == df_master["Home"]) & (df_master["Predicted.Score.Diff"] < 0)) |
-    ((df_master["Predicted.Winner"] == df_master["Away"]) & (df_master["Predicted.Score.Diff"] > 0))
-)]
+    # Add circular bands for each probability range
+    for i, color in enumerate(colors):
+        fig_all.add_shape(
+            type="circle",
+            xref="x", yref="y",
+            x0=-(i+1) * rmse,
+            y0=-prob_thresholds[i] + 0.5,       # lower bound of probability band
+            x1=(i+1) * rmse,
+            y1=prob_thresholds[i],
+            fillcolor=color,
+            opacity=0.4,
+            line_width=0,
+            layer="below"
+        )
 
-# Set today's date as it currently stands in central time zone
-today_central = datetime.now(pytz.timezone('US/Central')).strftime('%Y-%m-%d')
+    fig_all.update_layout(
+        title="Game Winner Prediction Accuracy with Circular Error Bands", 
+        xaxis_title="Predicted Point Differential", 
+        yaxis_title="Predicted Win Probability",
+        xaxis_range=[0, 40],
+        yaxis_range=[0.5, 1.1]
+    )
+    fig_all.update_layout(legend=dict(font=dict(size=9)))
+    legend_title = "Model.Pick"
+    wrapped_title = "<br>".join(legend_title.split(" "))
+    fig_all.update_layout(legend=dict(title=dict(text=wrapped_title)))
+    return fig_all
 
-# Filter for upcoming games
-df_date = df_master[df_master["Date.Game"] >= today_central]
-df_plot = df_master[df_master["Date.Game"] >= today_central].copy()
 
 # --- UI ---
 app_ui = ui.page_fluid(
 
+    ui.head_content(ui.tags.script(src="plotly.min.js")),
+
     ui.h1("2025-2026 NCAA Men's Basketball Predictions"),
 
     ui.layout_columns(  
@@ -134,15 +352,15 @@ app_ui = ui.page_fluid(
             ui.input_selectize(
                 "date_select",
                 "Choose Date(s):",
-                choices=list(df_plot["Date.Game"].unique()),
+                choices=data.upcoming_dates(today_central),
                 selected=[today_central],
                 multiple=True
             ),
-            output_widget("daily_plot"),
+            ui.output_ui("daily_plot"),
             ui.output_data_frame("date_table"),
             ui.p("Note: Games where the Predicted.Score.Diff is negative means the Away team is the predicted winner."),
             ui.h2("Past Game Results"),
-            output_widget("all_plot"),
+            ui.output_ui("all_plot"),
             ui.output_data_frame("past_table")
         ),
         col_widths=(3, 9)
@@ -152,219 +370,100 @@ app_ui = ui.page_fluid(
 # --- Server ---
 def server(input, output, session):
 
+    @reactive.effect
+    def refresh_date_choices():
+        # New artifact: offer its upcoming dates, keeping the user's selection where possible
+        choices = current_data().upcoming_dates(central_today())
+        with reactive.isolate():
+            selected = [d for d in input.date_select() if d in choices] or [central_today()]
+        ui.update_selectize("date_select", choices=choices, selected=selected)
 
     @output
     @render.text
-    def model_date(df_played=df_played):
+    def model_date():
+        data = current_data()
         # Find the last Date.Game in df_played
-        last_date_played = df_played['Date.Game'].max()
+        last_date_played = data.df_played['Date.Game'].max()
         return f"- Trained using games played through: {last_date_played}"
 
     @output
     @render.text
     def model_spread():
-        return f"- Point Differential Model Standard Deviation: ± {round(df_metrics['rmse.spread'].item(), 1)} pts"
+        data = current_data()
+        return f"- Point Differential Model Standard Deviation: ± {format_metric(data.df_metrics['rmse.spread'].item(), 1, ' pts')}"
 
     @output
     @render.text
     def model_winloss_acc():
-        return f"- Game Winner Overall Prediction Accuracy: {round(100 * df_metrics['accuracy.moneyline'].item(), 1)}%"
+        data = current_data()
+        return f"- Game Winner Overall Prediction Accuracy: {format_metric(data.df_metrics['accuracy.moneyline'].item(), 100, '%')}"
 
     @output
     @render.text
     def model_winloss_prec():
-        return f"- Game Winner Model Predicted Underdog Win Accuracy (Precision): {round(100 * df_metrics['precision.moneyline'].item(), 1)}%"
+        data = current_data()
+        return f"- Game Winner Model Predicted Underdog Win Accuracy (Precision): {format_metric(data.df_metrics['precision.moneyline'].item(), 100, '%')}"
 
     @output
     @render.text
     def model_winloss_recall():
-        return f"- Game Winner Model Actual Underdog Win Detection Rate (Recall): {round(100 * df_metrics['recall.moneyline'].item(), 1)}%"
+        data = current_data()
+        return f"- Game Winner Model Actual Underdog Win Detection Rate (Recall): {format_metric(data.df_metrics['recall.moneyline'].item(), 100, '%')}"
 
     @output
     @render.text
     def model_winloss_f1():
-        return f"- Game Winner Model F1 Score: {round(100 * df_metrics['f1.moneyline'].item(), 1)}%"
+        data = current_data()
+        return f"- Game Winner Model F1 Score: {format_metric(data.df_metrics['f1.moneyline'].item(), 100, '%')}"
 
     @output
-    @render_widget
+    @render.ui
     def daily_plot():
-        today_central = datetime.now(pytz.timezone('US/Central')).strftime('%Y-%m-%d')
-        df_plot = df_master[df_master["Date.Game"] >= today_central].copy()
-
-        # Exclude records from df_plot where the predicted winner is not consistent with the predicted score difference
-        # For example, if the predicted winner is the home team but the predicted score difference is negative (indicating the away team is favored), remove that record
-        df_plot = df_plot[~(
-            ((df_plot["Predicted.Winner"] == df_plot["Home"]) & (df_plot["Predicted.Score.Diff"] < 0)) |
-            ((df_plot["Predicted.Winner"] == df_plot["Away"]) & (df_plot["Predicted.Score.Diff"] > 0))
-        )]
-        
-        # Create an 'Opponent' column for hover data
-        df_plot['Opponent'] = df_plot.apply(lambda row: row['Home'] if row['Predicted.Winner'] == row['Away'] else row['Away'], axis = 1)
-
-        # Adjust Predicted.Score.Diff to be absolute value for plotting
-        df_plot["Predicted.Score.Diff"] = df_plot.apply(
-            lambda row: -row["Predicted.Score.Diff"] if row["Predicted.Score.Diff"] < 0
-            else row["Predicted.Score.Diff"], axis=1)
-        
-        selected_dates = input.date_select()
-        df_filtered = df_plot[df_plot["Date.Game"].isin(selected_dates)]
-
-        # Build daily plot
-        fig_date = px.scatter(
-            df_filtered,
-            x="Predicted.Score.Diff",
-            y="Win.Probability",
-            color="Predicted.Winner.Ranking.Position",
-            opacity=0.7,
-            hover_data=["Date.Game","Predicted.Winner","Opponent","Predicted.Score.Diff","Win.Probability"]
-        )
-
-        fig_date.update_traces(marker=dict(size=6, opacity=0.7))
-
-        fig_date.add_annotation(
-            text="MOST PROBABLE",
-            x=rmse.item() + 15,
-            y=0.925,
-            showarrow=False,
-            font=dict(color="red")
-        )
-
-        fig_date.add_annotation(
-            text="WINNERS",
-            x=rmse.item() + 15,
-            y=0.9,
-            showarrow=False,
-            font=dict(color="red")
-        )
-
-        prob_thresholds = [0.67, 0.95, 1]
-        colors = [
-            "rgba(200,0,0,0.3)",    # red (low confidence)
-            "rgba(200,200,0,0.3)",  # yellow (medium confidence)
-            "rgba(0,200,0,0.3)"     # green (high confidence)
-        ]
-
-        # Add circular bands for each probability range
-        for i, color in enumerate(colors):
-            fig_date.add_shape(
-                type="circle",
-                xref="x", yref="y",
-                x0=-(i+1) * rmse.item(),
-                y0= 0.5 - (prob_thresholds[i] - 0.5),       # lower bound of probability band
-                x1=(i+1) * rmse.item(),
-                y1=prob_thresholds[i],     # upper bound of probability band
-                fillcolor=color,
-                opacity=0.4,
-                line_width=0,
-                layer="below"
-            )
-
-        fig_date.update_layout(
-            title="Predicted Winners with Circular Error Bands",
-            xaxis_title="Predicted Point Differential",
-            yaxis_title="Predicted Win Probability",
-            xaxis_range=[0, 40],
-            yaxis_range=[0.5, 1.1]
-            )
-        fig_date.update_layout(legend=dict(font=dict(size=9)))
-        legend_title = "Predicted.Winner. Ranking.Position"
-        wrapped_title = "<br>".join(legend_title.split(" "))
-        fig_date.update_layout(legend=dict(title=dict(text=wrapped_title)))
-        return fig_date
-
-
-
+        data = current_data()
+        # Upcoming games on the selected dates, from the per-date slices
+        today = central_today()
+        dates = tuple(sorted(d for d in input.date_select() if d >= today))
+        payload = cached(("daily_plot", data.version, dates),
+                         lambda: figure_html(build_daily_figure(data.plot_slice(dates), data.rmse)))
+        return ui.HTML(payload)
 
     @output
-    @render_widget
+    @render.ui
     def all_plot():
-        # Create a past results plot
-        df_past = df_played.copy()
-
-        # Exclude records from df_plot where the predicted winner is not consistent with the predicted score difference
-        # For example, if the predicted winner is the home team but the predicted score difference is negative (indicating the away team is favored), remove that record
-        df_past = df_past[~(
-            ((df_past["Predicted.Winner"] == df_past["Home"]) & (df_past["Predicted.Score.Diff"] < 0)) |
-            ((df_past["Predicted.Winner"] == df_past["Away"]) & (df_past["Predicted.Score.Diff"] > 0))
-        )]
-
-        df_past["Predicted.Score.Diff"] = df_past.apply(
-            lambda row: -row["Predicted.Score.Diff"] if row["Predicted.Score.Diff"] < 0
-            else row["Predicted.Score.Diff"], axis=1)
-
-        df_past["Model.Pick"] = df_past.apply(lambda row: "Correct" if row["Actual.Winner"] == row["Predicted.Winner"] else "Incorrect", axis=1)
-        
-        df_past['Opponent'] = df_past.apply(lambda row: row['Home'] if row['Predicted.Winner'] == row['Away'] else row['Away'], axis = 1)
-
-        df_past = df_past[df_past["Model.Pick"].notna()]
-        fig_all = px.scatter(
-            df_past, 
-            x="Predicted.Score.Diff", 
-            y="Win.Probability", 
-            color="Model.Pick", 
-            opacity=0.5, 
-            hover_data=["Date.Game",
-                        "Predicted.Winner",
-                        "Opponent",
-                        "Win.Probability",
-                        "Predicted.Score.Diff",
-                        "Model.Pick"]
-        )
-
-        prob_thresholds = [0.67, 0.95, 1]
-        colors = [
-            "rgba(200,0,0,0.3)",    # red (low confidence)
-            "rgba(200,200,0,0.3)",  # yellow (medium confidence)
-            "rgba(0,200,0,0.3)"     # green (high confidence)
-        ]
-
-        # Add circular bands for each probability range
-        for i, color in enumerate(colors):
-            fig_all.add_shape(
-                type="circle",
-                xref="x", yref="y",
-                x0=-(i+1) * rmse.item(),
-                y0=-prob_thresholds[i] + 0.5,       # lower bound of probability band
-                x1=(i+1) * rmse.item(),
-                y1=prob_thresholds[i],
-                fillcolor=color,
-                opacity=0.4,
-                line_width=0,
-                layer="below"
-            )
-
-        fig_all.update_layout(
-            title="Game Winner Prediction Accuracy with Circular Error Bands", 
-            xaxis_title="Predicted Point Differential", 
-            yaxis_title="Predicted Win Probability",
-            xaxis_range=[0, 40],
-            yaxis_range=[0.5, 1.1]
-        )
-        fig_all.update_layout(legend=dict(font=dict(size=9)))
-        legend_title = "Model.Pick"
-        wrapped_title = "<br>".join(legend_title.split(" "))
-        fig_all.update_layout(legend=dict(title=dict(text=wrapped_title)))
-
-        return fig_all
-
-
-
+        data = current_data()
+        # Played games where the two models agree (Model.Pick and Opponent are precomputed)
+        payload = cached(("all_plot", data.version),
+                         lambda: figure_html(build_past_figure(data.df_past, data.rmse)))
+        return ui.HTML(payload)
 
     @output
     @render.data_frame
     def date_table():
-        return render.DataGrid(df_date[["Date.Game","Home","Away","Predicted.Winner","Predicted.Winner.Ranking.Position","Predicted.Score.Diff","Win.Probability"]],
-                                styles={"searching": True, "ordering": True, "pageLength": 10, "filters": True}
-                                )
+        data = current_data()
+        today = central_today()
+        df_date = cached(("date_table", data.version, today),
+                         lambda: data.df_master[data.df_master["Date.Game"] >= today][DATE_TABLE_COLS])
+        return render.DataGrid(df_date, styles=TABLE_STYLES)
 
     @output
     @render.data_frame
     def past_table():
-        target_dates = [(datetime.now(pytz.timezone('US/Central')) - timedelta(days=i)).strftime('%Y-%m-%d') for i in [1,2,3]]
-        recent = df_master[df_master["Date.Game"].isin(target_dates)]
-        return render.DataGrid(recent[["Date.Game","Home","Away","Predicted.Winner","Actual.Winner","Predicted.Score.Diff","Actual.Score.Diff"]],
-                                styles={"searching": True, "ordering": True, "pageLength": 10, "filters": True}
-                                )
+        data = current_data()
+        target_dates = tuple((datetime.now(pytz.timezone('US/Central')) - timedelta(days=i)).strftime('%Y-%m-%d') for i in [1,2,3])
+        recent = cached(("past_table", data.version, target_dates),
+                        lambda: data.master_slice(target_dates)[PAST_TABLE_COLS])
+        return render.DataGrid(recent, styles=TABLE_STYLES)
 
 # --- App ---
-app = App(app_ui, server) 
\ No newline at end of file
+# The dashboard at / and the read-only JSON API at /api, both over the current artifact
+shiny_app = App(app_ui, server)
+api = make_api(lambda: data, cached, central_today)
+api.state.warm(data)
+app = Starlette(routes=[
+    Route("/plotly.min.js", lambda request: FileResponse(PLOTLY_JS, headers={"Cache-Control": "public, max-age=86400"})),
+    Mount("/api", app=api),
+    Mount("/", app=shiny_app),
+])
+
+threading.Thread(target=watch_artifact, daemon=True).start()
+ 
\ No newline at end of file
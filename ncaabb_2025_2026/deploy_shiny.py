@@ -1,9 +1,31 @@
+import fnmatch
+import os
 import subprocess
 
 # Deploy the Shiny app
-# Assumes your app.py defines `app = App(...)` and is in the current folder
-subprocess.run([
-    "/home/ec2-user/.local/bin/rsconnect", "deploy", "shiny",
-    "--entrypoint", "app:app",
-    "/home/ec2-user/NCAABB_2025_2026/ncaabb_2025_2026/."
-])
+# Assumes your app.py defines `app` (the dashboard and /api mounted together) and is in the current folder
+# The bundle installs only this folder's requirements.txt; data the app does not
+# read (the full predictions file) and build leftovers are left out of the upload
+RSCONNECT = "/home/ec2-user/.local/bin/rsconnect"
+DEPLOY_DIR = "/home/ec2-user/NCAABB_2025_2026/ncaabb_2025_2026/."
+EXCLUDES = ["__pycache__", "*.tmp", "NCAA_Basketball_Spread_Predictions_2025_2026.rds"]
+
+
+def excluded(name):
+    return any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDES)
+
+
+def bundle_files(folder):
+    """Paths of the files the deploy uploads from `folder` (run_pipeline hashes these)."""
+    files = []
+    for dirpath, dirnames, filenames in os.walk(folder):
+        dirnames[:] = sorted(d for d in dirnames if not excluded(d))
+        files += [os.path.join(dirpath, name) for name in sorted(filenames) if not excluded(name)]
+    return files
+
+
+if __name__ == "__main__":
+    command = [RSCONNECT, "deploy", "shiny", "--entrypoint", "app:app"]
+    for pattern in EXCLUDES:
+        command += ["--exclude", pattern]
+    subprocess.run(command + [DEPLOY_DIR])
@@ -1,74 +1,304 @@
-import subprocess
-import sys
+import argparse
+import contextlib
 import datetime
+import hashlib
+import importlib.util
+import io
+import json
+import os
 import shutil
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import instrumentation
 
 # ANSI color codes
 GREEN = "\033[92m"
 YELLOW = "\033[93m"
+RED = "\033[91m"
 RESET = "\033[0m"
 
 # Create a timestamped log file
 timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
 log_file = f"pipeline_log_{timestamp}.txt"
 
+# Structured metrics (requests, rows, stage wall/CPU/peak RSS) from every stage,
+# including the scraper subprocesses, which inherit the environment variable
+metrics_file = f"pipeline_metrics_{timestamp}.jsonl"
+
+# Input/output hashes of every stage's last successful run
+STATE_FILE = "pipeline_state.json"
+
+PREDICTIONS_FILE = "NCAA_Basketball_Spread_Predictions_2025_2026.rds"
+DISPLAY_FILE = "NCAA_Basketball_Display_2025_2026.rds"
+APP_DIR = "ncaabb_2025_2026"
+
+# Folder the deployed app watches for new artifacts (its NCAAB_DISPLAY_FILE lives here).
+# When set, new predictions are published there and hot-reloaded, and only code
+# changes redeploy; otherwise every new artifact ships with a redeploy.
+APP_DATA_DIR = os.environ.get("NCAAB_APP_DATA_DIR")
+
 # Track step outcomes
 step_results = {}
 
+_log_lock = threading.Lock()
+
+# In-process stages have their stdout captured (see run_stage); log lines from the
+# other stage threads meanwhile still go straight to the console
+_console = sys.stdout
+
 def log_message(message):
-    print(message)
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(message + "\n")
-
-# Function to run a Python script in format 'python script_name' and log output
-def run_python_script(script_name):
-    log_message(f"\n Running script {script_name}...")
-    result = subprocess.run([sys.executable, script_name], capture_output=True, text=True)
-    log_message(result.stdout)
-    if result.stderr:
-        log_message(f" Errors/Warnings in {script_name}:\n{result.stderr}")
-        step_results[script_name] = f"{YELLOW}Warnings/Errors{RESET}"
-    else:
-        step_results[script_name] = f"{GREEN}Success{RESET}"
-
-def run_notebook(notebook_name):
-    log_message(f"\n Executing notebook {notebook_name}...")
-    result = subprocess.run([
-        sys.executable, "-m", "nbconvert",
-        "--to", "notebook", "--execute",
-        "--inplace", notebook_name
-    ], capture_output=True, text=True)
-    log_message(result.stdout)
-    if result.stderr:
-        log_message(f" Errors/Warnings in {notebook_name}:\n{result.stderr}")
-        step_results[notebook_name] = f"{YELLOW}Warnings/Errors{RESET}"
+    with _log_lock:
+        print(message, file=_console)
+        with open(log_file, "a", encoding="utf-8") as f:
+            f.write(message + "\n")
+
+
+# -------------------------------
+# Stages
+# -------------------------------
+class Stage:
+    """One pipeline step: a command (or Python callable) with declared inputs and outputs.
+
+    `inputs=None` means the stage reads something that cannot be hashed (the
+    network), so it always runs. Otherwise it is skipped when its inputs and
+    outputs hash the same as after its last successful run. `after` lists the
+    stages it waits for; stages with no path between them run in parallel.
+    `inputs` may also be a function returning the list, called when the stage
+    is about to run, for inputs that upstream stages create.
+    """
+
+    def __init__(self, name, command, inputs=None, outputs=(), after=()):
+        self.name = name
+        self.command = command
+        self.inputs = inputs
+        self.outputs = list(outputs)
+        self.after = list(after)
+
+    def input_paths(self):
+        return self.inputs() if callable(self.inputs) else self.inputs
+
+    def describe(self):
+        return self.command.__name__ if callable(self.command) else " ".join(self.command)
+
+
+def publish_targets():
+    folders = [APP_DIR] + ([APP_DATA_DIR] if APP_DATA_DIR else [])
+    return [os.path.join(folder, filename) for folder in folders for filename in (PREDICTIONS_FILE, DISPLAY_FILE)]
+
+
+def copy_predictions():
+    # Copy then rename, so the running app never reads a half-written artifact
+    for target in publish_targets():
+        shutil.copy(os.path.basename(target), target + ".tmp")
+        os.replace(target + ".tmp", target)
+    return f"Copied {PREDICTIONS_FILE} and {DISPLAY_FILE} to {', '.join(sorted({os.path.dirname(t) for t in publish_targets()}))}."
+
+
+def train_and_score():
+    # In-process: no notebook kernel, and no outputs serialized back into the .ipynb
+    import model_training
+
+    result = model_training.run(verbose=False)
+    return (f"Trained model bundle {result['bundle_version']} in {result['training_seconds']:.1f}s "
+            f"and saved {len(result['df_predictions'])} predictions to {PREDICTIONS_FILE}.")
+
+
+def deploy_inputs():
+    # Exactly the files deploy_shiny.py uploads, so the two cannot drift apart. Listed when
+    # the stage runs, after File Copy has put the artifacts in place. With a watched data
+    # folder the app hot-reloads new artifacts, so only code changes redeploy.
+    spec = importlib.util.spec_from_file_location("deploy_shiny", os.path.join(APP_DIR, "deploy_shiny.py"))
+    deploy_shiny = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(deploy_shiny)
+    files = deploy_shiny.bundle_files(APP_DIR)
+    if APP_DATA_DIR:
+        files = [path for path in files if os.path.basename(path) != DISPLAY_FILE]
+    return files
+
+
+STAGES = [
+    Stage("web_scraping.py", [sys.executable, "web_scraping.py"],
+          outputs=["stats_store", "scores_store"]),
+    Stage("injury_report_scraping.py", [sys.executable, "injury_report_scraping.py"],
+          outputs=["ncaab_injury_dataframes_2025_2026.rds"]),
+    Stage("Model Training", train_and_score,
+          inputs=["stats_store", "scores_store", "ncaab_injury_dataframes_2025_2026.rds", "teamNamesSR.xlsx",
+                  "model_training.py", "feature_builder.py", "feature_cache.py", "stats_store.py", "scores_store.py",
+                  "model_bundle.py", "display_artifact.py"],
+          outputs=[PREDICTIONS_FILE, DISPLAY_FILE, "model_bundles/LATEST"],
+          after=["web_scraping.py", "injury_report_scraping.py"]),
+    Stage("File Copy", copy_predictions,
+          inputs=[PREDICTIONS_FILE, DISPLAY_FILE],
+          outputs=publish_targets(),
+          after=["Model Training"]),
+    Stage("Deploy Shiny App", ["python3", os.path.join(APP_DIR, "deploy_shiny.py")],
+          inputs=deploy_inputs,
+          after=["File Copy"]),
+]
+
+
+# -------------------------------
+# Content hashing
+# -------------------------------
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def path_digest(path):
+    # Files hash their content; folders hash every file below them, by relative path
+    if os.path.isfile(path):
+        return file_digest(path)
+    if not os.path.isdir(path):
+        return "missing"
+    digest = hashlib.sha256()
+    for dirpath, dirnames, filenames in os.walk(path):
+        dirnames[:] = sorted(d for d in dirnames if d != "__pycache__")
+        for name in sorted(filenames):
+            if name.endswith(".tmp"):
+                continue
+            file_path = os.path.join(dirpath, name)
+            digest.update(f"{os.path.relpath(file_path, path)}:{file_digest(file_path)}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def paths_digest(paths):
+    return {path: path_digest(path) for path in paths}
+
+
+def load_state():
+    if not os.path.exists(STATE_FILE):
+        return {}
+    with open(STATE_FILE, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state):
+    with open(STATE_FILE + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=1)
+    os.replace(STATE_FILE + ".tmp", STATE_FILE)
+
+
+# -------------------------------
+# Running
+# -------------------------------
+def run_stage(stage, state, force=False):
+    """Run one stage unless it is up to date. Returns (ok, outcome, seconds, new state entry)."""
+    start = time.time()
+    entry = None
+    inputs = stage.input_paths()
+    if inputs is not None:
+        entry = {"command": stage.describe(), "inputs": paths_digest(inputs)}
+        previous = state.get(stage.name)
+        if not force and previous and previous.get("command") == entry["command"] \
+                and previous.get("inputs") == entry["inputs"] \
+                and previous.get("outputs") == paths_digest(stage.outputs) \
+                and "missing" not in previous.get("outputs", {}).values():
+            log_message(f"\n Skipping {stage.name}: inputs and outputs unchanged since the last run.")
+            return True, f"{GREEN}Up to date{RESET}", time.time() - start, previous
+
+    log_message(f"\n Running {stage.name}...")
+    if callable(stage.command):
+        # Whatever it prints is captured and logged, like a subprocess stage's stdout
+        output = io.StringIO()
+        summary = None
+        try:
+            with contextlib.redirect_stdout(output):
+                summary = stage.command()
+            returncode, stderr = 0, ""
+        except Exception:
+            returncode, stderr = 1, traceback.format_exc()
+        log_message(output.getvalue())
+        if summary is not None:
+            log_message(f" {summary}")
     else:
-        step_results[notebook_name] = f"{GREEN}Success{RESET}"
+        result = subprocess.run(stage.command, capture_output=True, text=True)
+        log_message(result.stdout)
+        returncode, stderr = result.returncode, result.stderr
 
-if __name__ == "__main__":
-    # Step 1: Run web scraping
-    run_python_script("web_scraping.py")
+    seconds = time.time() - start
+    if stderr:
+        log_message(f" Errors/Warnings in {stage.name}:\n{stderr}")
+    log_message(f" Finished {stage.name} in {seconds:.1f}s (exit code {returncode})")
+
+    if returncode != 0:
+        return False, f"{RED}Failed{RESET}", seconds, None
+    if entry is not None:
+        entry["outputs"] = paths_digest(stage.outputs)
+    outcome = f"{YELLOW}Warnings/Errors{RESET}" if stderr else f"{GREEN}Success{RESET}"
+    return True, outcome, seconds, entry
+
+
+def run_graph(stages, force=False, max_parallel=4):
+    """Run every stage once its `after` stages are done, independent stages in parallel.
+
+    A stage whose upstream failed is not run. Returns {name: (outcome, seconds)}.
+    """
+    state = load_state()
+    pending = {stage.name: stage for stage in stages}
+    results = {}
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+        running = {}
+        while pending or running:
+            for name, stage in list(pending.items()):
+                if not all(dep in results for dep in stage.after):
+                    continue
+                del pending[name]
+                if any(dep in failed for dep in stage.after):
+                    log_message(f"\n Not running {name}: an upstream stage failed.")
+                    results[name] = (f"{RED}Skipped (upstream failed){RESET}", 0.0)
+                    failed.add(name)
+                    continue
+                running[pool.submit(run_stage, stage, state, force)] = name
 
-    # Step 2: Run injury report scraping
-    run_python_script("injury_report_scraping.py")
+            if not running:
+                if pending:
+                    raise RuntimeError(f"Stages with unknown or cyclic dependencies: {sorted(pending)}")
+                break
 
-    # Step 3: Run model training notebook
-    run_notebook("model_training_Spread+MoneyLine_model_NN.ipynb")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                ok, outcome, seconds, entry = future.result()
+                results[name] = (outcome, seconds)
+                if not ok:
+                    failed.add(name)
+                elif entry is not None:
+                    state[name] = entry
+                    save_state(state)
 
-    # Step 4: Copy NCAA_Basketball_Spread_Predictions_2025_2026.rds file to ncaabb_2025_2026 folder using shutil
-    shutil.copy("NCAA_Basketball_Spread_Predictions_2025_2026.rds", "ncaabb_2025_2026/NCAA_Basketball_Spread_Predictions_2025_2026.rds")
-    log_message(f"\n Copied NCAA_Basketball_Spread_Predictions_2025_2026.rds to ncaabb_2025_2026 folder.")
-    step_results["File Copy"] = f"{GREEN}Success{RESET}"
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape, train, publish and deploy, skipping stages that are up to date.")
+    parser.add_argument("--force", action="store_true", help="run every stage even if its inputs are unchanged")
+    parser.add_argument("--max-parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    os.environ[instrumentation.METRICS_ENV] = os.path.abspath(metrics_file)
+
+    run_start = time.time()
+    results = run_graph(STAGES, args.force, args.max_parallel)
+    for stage in STAGES:
+        step_results[stage.name] = results[stage.name]
 
-    # Step 5: Run app
-    subprocess.run(["python3", "ncaabb_2025_2026/deploy_shiny.py"])
-    log_message(f"\n Launched Shiny app deployment script.")
-    step_results["Deploy Shiny App"] = f"{GREEN}Success{RESET}"
-    
     # Final summary
     log_message("\n Workflow Summary:")
-    for step, outcome in step_results.items():
-        log_message(f" - {step}: {outcome}")
+    for step, (outcome, seconds) in step_results.items():
+        log_message(f" - {step}: {outcome} ({seconds:.1f}s)")
+
+    log_message("\n" + instrumentation.summary_report(metrics_file))
 
-    log_message("\n Workflow completed (errors were logged if any occurred).")
-    print(f" Logs saved to {log_file}")
\ No newline at end of file
+    log_message(f"\n Workflow completed in {time.time() - run_start:.1f}s (errors were logged if any occurred).")
+    print(f" Logs saved to {log_file}, metrics to {metrics_file}")
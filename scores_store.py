@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import pickle
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# -------------------------------
+# Config
+# -------------------------------
+# One Parquet file per game date:  scores_store/2025-11-10.parquet
+# plus scores_store/off_days.json listing past dates that had no games
+STORE_DIR = "scores_store"
+OFF_DAYS_FILE = "off_days.json"
+
+KEY_COLS = ["date_game", "team_name_home", "team_name_away"]
+SCORE_COLS = ["team_score_home", "team_score_away"]
+COLUMNS = ["date_game", "date_stat", "team_name_home", "team_score_home", "team_name_away", "team_score_away"]
+
+
+def partition_path(date, root=STORE_DIR):
+    return os.path.join(root, f"{date}.parquet")
+
+
+def date_key(values):
+    return pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+
+
+# -------------------------------
+# Typed values
+# -------------------------------
+def normalize(df):
+    # Scraped or legacy rows -> fixed column order and dtypes; unplayed games have NaN scores
+    df = df[COLUMNS].copy()
+    df["date_game"] = pd.to_datetime(df["date_game"]).dt.normalize().astype("datetime64[ns]")
+    df["date_stat"] = pd.to_datetime(df["date_stat"]).dt.normalize().astype("datetime64[ns]")
+    df["team_name_home"] = df["team_name_home"].astype(str)
+    df["team_name_away"] = df["team_name_away"].astype(str)
+    for col in SCORE_COLS:
+        df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+    return df
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+def write_day(date, df, root=STORE_DIR):
+    """Write (or replace) the partition for one game date; other dates are never touched."""
+    path = partition_path(date, root)
+    if df is None or df.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    os.makedirs(root, exist_ok=True)
+    table = pa.Table.from_pandas(df[COLUMNS], preserve_index=False)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def upsert(df_new, root=STORE_DIR):
+    """Insert new games and update existing ones in place, keyed on (date_game, home, away).
+
+    A scraped score replaces the stored one; a missing score never overwrites a
+    stored one. Only dates whose rows actually changed are rewritten, and those
+    dates are returned.
+    """
+    if df_new is None or df_new.empty:
+        return []
+    df_new = normalize(df_new).dropna(subset=["team_name_home", "team_name_away"])
+    df_new = df_new.drop_duplicates(subset=KEY_COLS, keep="last")
+
+    changed = []
+    for date, games in df_new.groupby(date_key(df_new["date_game"]).to_numpy(), sort=True):
+        if os.path.exists(partition_path(date, root)):
+            stored = normalize(read_day(date, root))
+            merged = games.set_index(KEY_COLS).combine_first(stored.set_index(KEY_COLS))
+            # Stored games keep their order; new games are appended in page order
+            order = stored.set_index(KEY_COLS).index.append(games.set_index(KEY_COLS).index).unique()
+            merged = merged.reindex(order).reset_index()[COLUMNS]
+            merged = normalize(merged)
+            if merged.equals(stored):
+                continue
+        else:
+            merged = games.reset_index(drop=True)
+
+        write_day(date, merged, root)
+        changed.append(date)
+    return changed
+
+
+def mark_off_days(dates, root=STORE_DIR):
+    # Remember dates whose page listed no games so they are not fetched again
+    off_days = sorted(set(list_off_days(root)) | set(dates))
+    path = os.path.join(root, OFF_DAYS_FILE)
+    os.makedirs(root, exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(off_days, f)
+    os.replace(path + ".tmp", path)
+
+
+def import_pickle(filename, root=STORE_DIR):
+    """One-off migration of the old Scores.rds frame into the store."""
+    if list_dates(root) or not os.path.exists(filename):
+        return 0
+    with open(filename, "rb") as f:
+        df_scores = pickle.load(f)
+    if df_scores.empty:
+        return 0
+    changed = upsert(df_scores, root)
+    print(f"Imported {len(changed)} dates from {filename} into {root}")
+    return len(changed)
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def list_dates(root=STORE_DIR):
+    if not os.path.isdir(root):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(root) if name.endswith(".parquet"))
+
+
+def list_off_days(root=STORE_DIR):
+    path = os.path.join(root, OFF_DAYS_FILE)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_day(date, root=STORE_DIR):
+    return pq.read_table(partition_path(date, root), memory_map=True).to_pandas()
+
+
+def unfinished_dates(root=STORE_DIR):
+    # Dates with at least one game still missing a score (reads only the score columns)
+    dates = []
+    for date in list_dates(root):
+        scores = pq.read_table(partition_path(date, root), columns=SCORE_COLS, memory_map=True).to_pandas()
+        if scores.isna().any(axis=None):
+            dates.append(date)
+    return dates
+
+
+def load_scores(dates=None, root=STORE_DIR):
+    """All stored games (or those on `dates`), in date order."""
+    stored = list_dates(root)
+    dates = stored if dates is None else [d for d in dates if d in stored]
+    if not dates:
+        return normalize(pd.DataFrame(columns=COLUMNS))
+    # One multi-threaded read over all partitions; file order keeps the date order
+    paths = [partition_path(date, root) for date in dates]
+    return pq.read_table(paths, memory_map=True).to_pandas()
+
+
+# -------------------------------
+# Reports
+# -------------------------------
+def export_excel(filename="df_scores.xlsx", root=STORE_DIR):
+    # On-demand spreadsheet of every game; nothing in the pipeline reads it back
+    df_scores = load_scores(root=root)
+    df_scores.to_excel(filename, index=False)
+    print(f"df_scores has been written to {filename}")
+    return filename
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export the scores store.")
+    parser.add_argument("--excel", nargs="?", const="df_scores.xlsx", metavar="FILE",
+                        help="write every stored game to an Excel report (default df_scores.xlsx)")
+    args = parser.parse_args()
+    if args.excel:
+        export_excel(args.excel)
+    else:
+        print(f"{len(list_dates())} game dates stored in {STORE_DIR}; unfinished: {unfinished_dates()}")
@@ -0,0 +1,143 @@
+import os
+import pickle
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# -------------------------------
+# Config
+# -------------------------------
+# One Parquet file per (side, date):  stats_store/home/2025-11-10.parquet
+STORE_DIR = "stats_store"
+SIDES = ("home", "away")
+
+
+def partition_path(side, date, root=STORE_DIR):
+    return os.path.join(root, side, f"{date}.parquet")
+
+
+# -------------------------------
+# Typed values
+# -------------------------------
+def parse_numeric(values):
+    """TeamRankings cell text -> float32: "45.3%" -> 45.3, "1,204" -> 1204, "--" -> NaN."""
+    text = pd.Series(values, dtype="object").astype(str)
+    text = text.str.replace("%", "", regex=False).str.replace(",", "", regex=False)
+    return pd.to_numeric(text, errors="coerce").astype("float32").to_numpy()
+
+
+def fill_split_from_season(df):
+    # A team with no home (or away) games yet shows "--" in page.Home/page.Away;
+    # use its season value for page instead
+    for col in df.columns:
+        for suffix in (".Home", ".Away"):
+            base_col = col[:-len(suffix)]
+            if col.endswith(suffix) and base_col in df.columns:
+                df[col] = df[col].fillna(df[base_col])
+    return df
+
+
+def normalize_day(df):
+    # Convert a legacy string-valued stats frame to the typed layout
+    df = df.copy()
+    for col in df.columns:
+        if col not in ("Date", "Team"):
+            df[col] = parse_numeric(df[col])
+    return fill_split_from_season(df)
+
+
+# -------------------------------
+# Writing
+# -------------------------------
+def write_day(side, date, df, root=STORE_DIR):
+    """Write (or replace) the partition for one date; other dates are never touched.
+
+    A None/empty frame removes the partition so the date is picked up as missing
+    on the next scrape, the same way a None entry in the old pickle dict was.
+    """
+    path = partition_path(side, date, root)
+    if df is None or df.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    tmp_path = path + ".tmp"
+    pq.write_table(table, tmp_path, compression="zstd")
+    os.replace(tmp_path, path)
+
+
+def import_pickle(side, filename, root=STORE_DIR):
+    """One-off migration of an old Stats_Home.rds/Stats_Away.rds dict into the store."""
+    if list_dates(side, root) or not os.path.exists(filename):
+        return 0
+    with open(filename, "rb") as f:
+        df_stats = pickle.load(f)
+    count = 0
+    for date, df in df_stats.items():
+        if df is not None:
+            write_day(side, date, normalize_day(df), root)
+            count += 1
+    print(f"Imported {count} dates from {filename} into {os.path.join(root, side)}")
+    return count
+
+
+# -------------------------------
+# Reading
+# -------------------------------
+def list_dates(side, root=STORE_DIR):
+    folder = os.path.join(root, side)
+    if not os.path.isdir(folder):
+        return []
+    return sorted(name[:-len(".parquet")] for name in os.listdir(folder) if name.endswith(".parquet"))
+
+
+def partition_fingerprint(side, date, root=STORE_DIR):
+    # Changes whenever the partition is rewritten; "" if the date is not stored
+    path = partition_path(side, date, root)
+    if not os.path.exists(path):
+        return ""
+    st = os.stat(path)
+    return f"{st.st_mtime_ns}-{st.st_size}"
+
+
+def read_columns(side, date, root=STORE_DIR):
+    # Reads only the Parquet footer, not the data
+    return pq.read_schema(partition_path(side, date, root)).names
+
+
+def read_day(side, date, columns=None, root=STORE_DIR):
+    path = partition_path(side, date, root)
+    if columns is not None:
+        available = set(read_columns(side, date, root))
+        columns = [c for c in columns if c in available]
+    return pq.read_table(path, columns=columns, memory_map=True).to_pandas()
+
+
+def _select(side, dates, columns, root):
+    stored = set(list_dates(side, root))
+    dates = sorted(stored) if dates is None else [d for d in dates if d in stored]
+    if columns is not None:
+        columns = ["Date", "Team"] + [c for c in columns if c not in ("Date", "Team")]
+    return dates, columns
+
+
+def load_stats(side, dates=None, columns=None, root=STORE_DIR):
+    """Return one long frame (Date, Team, ...) for the selected dates and columns.
+
+    `dates` defaults to every stored date; `columns` defaults to all columns.
+    Date and Team are always included.
+    """
+    dates, columns = _select(side, dates, columns, root)
+    frames = [read_day(side, date, columns, root) for date in dates]
+    if not frames:
+        return pd.DataFrame(columns=columns or ["Date", "Team"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_stats_dict(side, dates=None, columns=None, root=STORE_DIR):
+    """Same selection as load_stats(), keyed by date like the old pickle dicts."""
+    dates, columns = _select(side, dates, columns, root)
+    return {date: read_day(side, date, columns, root) for date in dates}
@@ -1,9 +1,13 @@
 import pandas as pd
+import numpy as np
 from datetime import datetime, timedelta
-from bs4 import BeautifulSoup
-import requests
-import pickle
-import os
+
+from fetch_utils import fetch_then_parse
+import html_parsing
+import instrumentation
+import scores_store
+import stats_store
+from http_archive import fetch_page
 
 # -------------------------------
 # Config
@@ -12,6 +16,10 @@ date_start = datetime.strptime("2025-11-09", "%Y-%m-%d")
 date_end = datetime.now().date().strftime("%Y-%m-%d")
 dates = pd.date_range(date_start, date_end).strftime("%Y-%m-%d").tolist()
 
+# Dates with unfinished games are re-scraped for this many days, then left alone
+# (postponed and cancelled games never get a score)
+RECHECK_DAYS = 7
+
 pages = [
     # Offense
     "offensive-efficiency", "three-point-pct", "two-point-pct", "free-throw-pct", "percent-of-points-from-3-pointers",
@@ -30,298 +38,259 @@ pages = [
     "schedule-strength-by-other", "predictive-by-other", "consistency-by-other"
 ]
 
+# Add header to requests
+headers = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Safari/537.36"
+    ),
+    "Referer": "https://www.basketball-reference.com/"
+}
+
 # -------------------------------
 # Helpers
 # -------------------------------
-def load_rds(filename):
-    if not os.path.exists(filename):
-        return {}
-    with open(filename, 'rb') as f:
-        return pickle.load(f)
-
-def scrape_table(url):
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    table = soup.find('table', class_='tr-table datatable scrollable')
-    if not table:
+def page_url(j, page, date):
+    base_url = "https://www.teamrankings.com/ncaa-basketball/ranking/" if j >= len(pages) - 3 \
+               else "https://www.teamrankings.com/ncaa-basketball/stat/"
+    return f"{base_url}{page}?date={date}"
+
+def scores_url(date):
+    return f"https://www.sports-reference.com/cbb/boxscores/index.cgi?month={date.month}&day={date.day}&year={date.year}"
+
+def stats_table(html, url):
+    # Fastest installed parser (selectolax/lxml/html.parser), tokenizing only the stats table
+    df = html_parsing.parse_stats_page(html)
+    if df is None:
         print(f"Table not found at {url}")
         return pd.DataFrame()
+    return df
 
-    headers = [th.get_text(strip=True) for th in table.find_all('th')]
-    rows = []
-    for tr in table.find_all('tr'):
-        cells = tr.find_all(['td', 'th'])
-        row = [cell.get_text(strip=True) for cell in cells]
-        if row:
-            rows.append(row)
-
-    return pd.DataFrame(rows, columns=headers if headers else None)
-
-# -------------------------------
-# Load existing stats
-# -------------------------------
-df_stats_home = load_rds("Stats_Home.rds")
-df_stats_away = load_rds("Stats_Away.rds")
-
-# -------------------------------
-# Identify missing dates
-# -------------------------------
-dates_stat = pd.date_range(date_start, date_end).strftime("%Y-%m-%d").tolist()
-home_none_keys = [k for k, v in df_stats_home.items() if v is None]
-away_none_keys = [k for k, v in df_stats_away.items() if v is None]
-
-missing_date = sorted(set(
-    [d for d in dates_stat if d not in df_stats_home] +
-    [d for d in dates_stat if d not in df_stats_away] +
-    home_none_keys + away_none_keys
-))
+def scrape_table(url):
+    return stats_table(fetch_page(url).text, url)
 
-print(f"Total missing dates to scrape: {len(missing_date)}")
+def team_key(teams):
+    # Strip the "(W-L)" suffix and number repeated names so every row has a unique key
+    teams = teams.str.replace(r"\(.*\)", "", regex=True).str.strip()
+    return pd.MultiIndex.from_arrays([teams, teams.groupby(teams).cumcount()], names=["Team", "n"])
 
-# -------------------------------
-# Expected columns
-# -------------------------------
-expected_home_cols = set()
-expected_away_cols = set()
-for j, page in enumerate(pages):
-    if j >= len(pages) - 3:  # ratings
-        expected_home_cols.add(page)
-        expected_away_cols.add(page)
-    else:
-        expected_home_cols.update([page, f"{page}.Last3", f"{page}.Last1", f"{page}.Home"])
-        expected_away_cols.update([page, f"{page}.Last3", f"{page}.Last1", f"{page}.Away"])
+def column_values(df, col):
+    if col not in df.columns:
+        return np.full(len(df), np.nan, dtype="float32")
+    return df[col].to_numpy()
 
-# -------------------------------
-# Check existing dates for missing columns
-# -------------------------------
-dates_to_rescrape = set(missing_date)
-for date, df in df_stats_home.items():
-    if df is not None:
-        missing_cols = expected_home_cols - set(df.columns)
-        if missing_cols:
-            print(f"Home stats for {date} missing columns: {missing_cols}")
-            dates_to_rescrape.add(date)
-
-for date, df in df_stats_away.items():
-    if df is not None:
-        missing_cols = expected_away_cols - set(df.columns)
-        if missing_cols:
-            print(f"Away stats for {date} missing columns: {missing_cols}")
-            dates_to_rescrape.add(date)
-
-dates_to_rescrape = sorted(dates_to_rescrape)
-print(f"Dates to scrape or rescrape: {dates_to_rescrape}")
-
-# -------------------------------
-# Scrape data
-# -------------------------------
-for date in dates_to_rescrape:
-    print(f"Scraping date: {date}")
-    df_day_home, df_day_away = None, None
+def assemble_day(date, results):
+    # Build the home and away tables for one date from {page index: scraped table}.
+    # The first usable page fixes the team rows; every other page is reindexed onto
+    # those rows and all pages are joined in a single concat.
+    base_key = None
+    frames_home, frames_away = [], []
 
     for j, page in enumerate(pages):
-        base_url = "https://www.teamrankings.com/ncaa-basketball/ranking/" if j >= len(pages) - 3 \
-                   else "https://www.teamrankings.com/ncaa-basketball/stat/"
-        url = f"{base_url}{page}?date={date}"
+        df_scrape = results.get(j)
+        if df_scrape is None or df_scrape.empty or "Team" not in df_scrape.columns:
+            continue
 
         try:
-            df_scrape = scrape_table(url)
-            if df_scrape.empty or "Team" not in df_scrape.columns:
-                continue
-            df_scrape['Team'] = df_scrape['Team'].str.replace(r"\(.*\)", "", regex=True).str.strip()
-
+            key = team_key(df_scrape["Team"])
             if j >= len(pages) - 3:  # ratings
-                df_rating = pd.DataFrame({
-                    "Date": date,
-                    "Team": df_scrape["Team"],
-                    page: df_scrape["Rating"]
-                })
-                df_day_home = df_rating if df_day_home is None else pd.merge(df_day_home, df_rating, on=["Date", "Team"], how="left")
-                df_day_away = df_rating if df_day_away is None else pd.merge(df_day_away, df_rating, on=["Date", "Team"], how="left")
+                shared = {page: df_scrape["Rating"].to_numpy()}
+                home_only, away_only = {}, {}
             else:
-                df_stat_home = pd.DataFrame({
-                    "Date": date,
-                    "Team": df_scrape["Team"],
-                    page: df_scrape.get("2025"),
-                    f"{page}.Last3": df_scrape.get("Last 3"),
-                    f"{page}.Last1": df_scrape.get("Last 1"),
-                    f"{page}.Home": df_scrape.get("Home")
-                })
-                df_stat_away = pd.DataFrame({
-                    "Date": date,
-                    "Team": df_scrape["Team"],
-                    page: df_scrape.get("2025"),
-                    f"{page}.Last3": df_scrape.get("Last 3"),
-                    f"{page}.Last1": df_scrape.get("Last 1"),
-                    f"{page}.Away": df_scrape.get("Away")
-                })
-                df_day_home = df_stat_home if df_day_home is None else pd.merge(df_day_home, df_stat_home, on=["Date", "Team"], how="left")
-                df_day_away = df_stat_away if df_day_away is None else pd.merge(df_day_away, df_stat_away, on=["Date", "Team"], how="left")
-
+                shared = {
+                    page: column_values(df_scrape, "2025"),
+                    f"{page}.Last3": column_values(df_scrape, "Last 3"),
+                    f"{page}.Last1": column_values(df_scrape, "Last 1"),
+                }
+                home_only = {f"{page}.Home": column_values(df_scrape, "Home")}
+                away_only = {f"{page}.Away": column_values(df_scrape, "Away")}
+
+            frame_home = pd.DataFrame({**shared, **home_only}, index=key)
+            frame_away = pd.DataFrame({**shared, **away_only}, index=key)
         except Exception as e:
-            print(f"Failed to scrape {url}: {e}")
-
-    df_stats_home[date] = df_day_home
-    df_stats_away[date] = df_day_away
-
-    with open("Stats_Home.rds", "wb") as f:
-        pickle.dump(df_stats_home, f)
-    with open("Stats_Away.rds", "wb") as f:
-        pickle.dump(df_stats_away, f)
-
-print("All scraped dates for home_stats:", sorted(df_stats_home.keys()))
-print("All scraped dates for away_stats:", sorted(df_stats_away.keys()))
+            print(f"Failed to scrape {page_url(j, page, date)}: {e}")
+            continue
 
-# Add header to requests
-headers = {
-    "User-Agent": (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-        "AppleWebKit/537.36 (KHTML, like Gecko) "
-        "Chrome/120.0.0.0 Safari/537.36"
-    ),
-    "Referer": "https://www.basketball-reference.com/"
-}
-
-
-#Function to scrape scores from sports-reference.com
-def scrape_scores_for_date(date):
-    year = date.year
-    month = date.month
-    day = date.day
-    url = f"https://www.sports-reference.com/cbb/boxscores/index.cgi?month={month}&day={day}&year={year}"
-    
-    try:
-        response = requests.get(url, headers=headers)
-
-        # Debugging output
-        print(response.status_code)
-
-        soup = BeautifulSoup(response.content, "html.parser")
-        teams = soup.select(".teams")
-
-        daily_scores = []
-
-        for t in teams:
-            try:
-                rows = t.select("tr")
-                
-                # if rows[2] contains "Women's", skip it
-                gender_row = rows[2]
-                gender = gender_row.select_one("td").text
-                
-                
-                womens_game = ["Women's", "Womens", "WBIT", "WNIT"]
-
-                # if womens_game in gender, skip
-                if any(g in gender for g in womens_game):
-                    continue
-
-                away_row = rows[0]
-                home_row = rows[1]
-
-                team_name_away = away_row.select_one("td a").text
-                team_name_home = home_row.select_one("td a").text
-
-                try:
-                    team_score_away = int(away_row.select("td")[1].text)
-                    team_score_home = int(home_row.select("td")[1].text)
-                except:
-                    print(f"Scores not available for {team_name_away} vs {team_name_home} on {date}")
-                    team_score_away = None
-                    team_score_home = None
-                
-
-                # Sometimes there's a third row (e.g., for overtime info or gender), ignore it
-                
-                daily_scores.append({
-                    "date_game": date,
-                    "date_stat": date - timedelta(days=1),
-                    "team_name_home": team_name_home,
-                    "team_score_home": team_score_home,
-                    "team_name_away": team_name_away,
-                    "team_score_away": team_score_away
-                })
-            except Exception as e:
-                print(f"Error parsing game: {e}")
-                continue
-
-        return pd.DataFrame(daily_scores)
-
-    except Exception as e:
-        print(f"Failed to fetch page for {date}: {e}")
-        return pd.DataFrame()
-
-#Redefine date_start to offset scores by one day
-#date_start = date_start + timedelta(days=1) 
-#date_end = datetime.now() + timedelta(days=1)
-#today = datetime.now().date()
-target_dates = pd.date_range(date_start + timedelta(days=1), date_end).date.tolist()
-
-# Load previously saved scores
-try:
-    with open("Scores.rds", "rb") as f:
-        df_scores = pickle.load(f)
-except:
-    df_scores = pd.DataFrame()
-
-# Identify missing dates from existing data
-existing_dates = pd.to_datetime(df_scores['date_game']).dt.date.unique() if not df_scores.empty else []
-missing_dates = [d for d in target_dates if d not in existing_dates]
-
-# Add tomorrow to target dates if not present
-tomorrow = datetime.now().date() + timedelta(days=1)
-if tomorrow not in target_dates:
-    target_dates.append(tomorrow)
-
-# Limit scrape dates to the last four days of target dates
-scrape_dates = sorted(target_dates)[-4:]
-
-# Add any missing dates to scrape_dates
-for d in missing_dates:
-    if d not in scrape_dates:
-        scrape_dates.append(d)
-
-scrape_dates = sorted(scrape_dates)
-
-# If you need strings for scraping URLs, convert later:
-scrape_dates_str = [d.strftime("%Y-%m-%d") for d in scrape_dates]
-
-# Create a scores dataframe
-df_scores_new = None
-
-for date in scrape_dates:
-    print(f"Scraping scores for {date}")
-    df_day = scrape_scores_for_date(date)
-    if not df_day.empty:
-        if df_scores_new is None:
-            df_scores_new = df_day.copy()
+        if base_key is None:
+            base_key = key
         else:
-            df_scores_new = pd.concat([df_scores_new, df_day], ignore_index=True)
-
+            frame_home = frame_home.reindex(base_key)
+            frame_away = frame_away.reindex(base_key)
+        frames_home.append(frame_home)
+        frames_away.append(frame_away)
 
-# Drop NAs
-df_scores_new.dropna(subset=["team_name_home", "team_name_away"], inplace=True)
+    if base_key is None:
+        return None, None
 
-# Remove duplicates (based on unique matchups)
-df_scores_new.drop_duplicates(
-    subset=["date_game", "team_name_home", "team_name_away"],
-    keep="first", inplace=True
-)
+    teams = base_key.get_level_values("Team")
+    tables = []
+    for frames in (frames_home, frames_away):
+        df_day = pd.concat(frames, axis=1)
+        stats_store.fill_split_from_season(df_day)
+        df_day.insert(0, "Team", teams)
+        df_day.insert(0, "Date", date)
+        tables.append(df_day.reset_index(drop=True))
+    return tables[0], tables[1]
 
-# Append to existing and save
-df_scores = pd.concat([df_scores_new, df_scores], ignore_index=True)
-df_scores.drop_duplicates(
-    subset=["date_game", "team_name_home", "team_name_away"],
-    keep="first", inplace=True
-)
 
-# Print statement for all scraped dates
-print("All scraped dates for scores:", sorted(pd.to_datetime(df_scores['date_game']).dt.strftime("%Y-%m-%d").unique()))
+# -------------------------------
+# Fetch and parse stages
+# -------------------------------
+# Fetchers run on threads and archive every response (http_archive); the parse
+# functions below run in worker processes (they must stay at module level).
+# NCAAB_REPLAY=1 re-parses archived pages without touching the network.
+def fetch_stats_page(task):
+    date, j, page = task
+    return fetch_page(page_url(j, page, date)).text
+
+def parse_stats_page(task, html):
+    date, j, page = task
+    return stats_table(html, page_url(j, page, date))
+
+def fetch_scores_page(date):
+    page = fetch_page(scores_url(date), headers=headers)
+    # An error page would parse as a day without games
+    if page.status != 200:
+        raise RuntimeError(f"HTTP {page.status} for {page.url}")
+    return page.text
+
+def parse_scores_page(date, html):
+    return html_parsing.parse_scores_page(html, date)
+
+
+def scrape_stats():
+    # -------------------------------
+    # Load existing stats
+    # -------------------------------
+    # Stats live in a date-partitioned Parquet store; old pickle dicts are imported once
+    stats_store.import_pickle("home", "Stats_Home.rds")
+    stats_store.import_pickle("away", "Stats_Away.rds")
+
+    stored_home_dates = stats_store.list_dates("home")
+    stored_away_dates = stats_store.list_dates("away")
+
+    # -------------------------------
+    # Identify missing dates
+    # -------------------------------
+    dates_stat = pd.date_range(date_start, date_end).strftime("%Y-%m-%d").tolist()
+    missing_date = sorted(set(
+        [d for d in dates_stat if d not in stored_home_dates] +
+        [d for d in dates_stat if d not in stored_away_dates]
+    ))
+
+    print(f"Total missing dates to scrape: {len(missing_date)}")
+
+    # -------------------------------
+    # Expected columns
+    # -------------------------------
+    expected_home_cols = set()
+    expected_away_cols = set()
+    for j, page in enumerate(pages):
+        if j >= len(pages) - 3:  # ratings
+            expected_home_cols.add(page)
+            expected_away_cols.add(page)
+        else:
+            expected_home_cols.update([page, f"{page}.Last3", f"{page}.Last1", f"{page}.Home"])
+            expected_away_cols.update([page, f"{page}.Last3", f"{page}.Last1", f"{page}.Away"])
+
+    # -------------------------------
+    # Check existing dates for missing columns
+    # -------------------------------
+    dates_to_rescrape = set(missing_date)
+    for date in stored_home_dates:
+        missing_cols = expected_home_cols - set(stats_store.read_columns("home", date))
+        if missing_cols:
+            print(f"Home stats for {date} missing columns: {missing_cols}")
+            dates_to_rescrape.add(date)
 
-# Save the result
-with open("Scores.rds", "wb") as f:
-    pickle.dump(df_scores, f)
+    for date in stored_away_dates:
+        missing_cols = expected_away_cols - set(stats_store.read_columns("away", date))
+        if missing_cols:
+            print(f"Away stats for {date} missing columns: {missing_cols}")
+            dates_to_rescrape.add(date)
 
-# Write df_scores to Excel
-df_scores.to_excel("df_scores.xlsx", index=False)
-print("df_scores has been written to df_scores.xlsx")
+    dates_to_rescrape = sorted(dates_to_rescrape)
+    print(f"Dates to scrape or rescrape: {dates_to_rescrape}")
+
+    # -------------------------------
+    # Scrape data
+    # -------------------------------
+    # Every (date, page) pair is fetched concurrently and parsed in the process pool;
+    # a date is assembled and saved as soon as all of its pages have come back.
+    tasks = [(date, j, page) for date in dates_to_rescrape for j, page in enumerate(pages)]
+    day_results = {date: {} for date in dates_to_rescrape}
+    rows_parsed = 0
+
+    for (date, j, page), df_scrape, error in fetch_then_parse(tasks, fetch_stats_page, parse_stats_page):
+        if error is not None:
+            print(f"Failed to scrape {page_url(j, page, date)}: {error}")
+        elif df_scrape is not None:
+            rows_parsed += len(df_scrape)
+        day_results[date][j] = df_scrape
+        if len(day_results[date]) < len(pages):
+            continue
+
+        print(f"Assembling stats for date: {date}")
+        df_day_home, df_day_away = assemble_day(date, day_results.pop(date))
+
+        # Only this date's partitions are written
+        stats_store.write_day("home", date, df_day_home)
+        stats_store.write_day("away", date, df_day_away)
+
+    instrumentation.record_rows("stats_page_rows", rows_parsed)
+    print("All scraped dates for home_stats:", stats_store.list_dates("home"))
+    print("All scraped dates for away_stats:", stats_store.list_dates("away"))
+
+
+def scrape_scores():
+    # -------------------------------
+    # Load existing scores
+    # -------------------------------
+    # Games live in a keyed, date-partitioned store; the old Scores.rds is imported once
+    scores_store.import_pickle("Scores.rds")
+    stored_dates = set(scores_store.list_dates()) | set(scores_store.list_off_days())
+
+    # -------------------------------
+    # Identify dates to scrape
+    # -------------------------------
+    # Scores are offset by one day from the stats; tomorrow's slate is always included
+    tomorrow = datetime.now().date() + timedelta(days=1)
+    target_dates = pd.date_range(date_start + timedelta(days=1), tomorrow).date.tolist()
+
+    # Missing dates, plus recent dates that still have games without a final score
+    recheck_from = (datetime.now().date() - timedelta(days=RECHECK_DAYS)).strftime("%Y-%m-%d")
+    unfinished = {d for d in scores_store.unfinished_dates() if d >= recheck_from}
+    scrape_dates = [d for d in target_dates if d.strftime("%Y-%m-%d") not in stored_dates or d.strftime("%Y-%m-%d") in unfinished]
+    print(f"Dates to scrape for scores: {[d.strftime('%Y-%m-%d') for d in scrape_dates]}")
+
+    # -------------------------------
+    # Scrape and upsert
+    # -------------------------------
+    changed, off_days = [], []
+    rows_parsed = 0
+    for date, df_day, error in fetch_then_parse(scrape_dates, fetch_scores_page, parse_scores_page):
+        print(f"Scraped scores for {date}")
+        if error is not None:
+            print(f"Failed to fetch page for {date}: {error}")
+            continue
+        rows_parsed += len(df_day)
+        if df_day.empty and date < datetime.now().date():
+            off_days.append(date.strftime("%Y-%m-%d"))
+        # Only the partitions whose games changed are rewritten
+        changed += scores_store.upsert(df_day)
+
+    if off_days:
+        scores_store.mark_off_days(off_days)
+
+    instrumentation.record_rows("score_rows", rows_parsed)
+    print(f"Updated score dates: {sorted(changed)}")
+    print("All scraped dates for scores:", scores_store.list_dates())
+
+
+# Parse workers re-import this module, so the scraping only runs as a script
+if __name__ == "__main__":
+    with instrumentation.stage("scrape_stats"):
+        scrape_stats()
+    with instrumentation.stage("scrape_scores"):
+        scrape_scores()